@@ -0,0 +1,90 @@
+"""
+Checks that every Excel reader engine reports issues on the same rows.
+
+Writes synthetic Customer Template data to an xlsx file with blank rows
+inside the data and after it, reads it with each available engine (and in
+small chunks with the streaming reader, as the batch tool does) and compares
+the issue tables of the Customer Template plan row for row. Exits with
+status 1 on any difference.
+
+Example:
+    python benchmarks/check_excel_rows.py --rows 2000
+"""
+import argparse
+import io
+import os
+import sys
+from pathlib import Path
+
+import openpyxl
+from openpyxl.styles import Font
+
+# Verdicts cached on disk must not hide differences between the engines
+os.environ.setdefault("IMPORT_WIZARD_VERDICT_CACHE_SIZE", "0")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import ingest  # noqa: E402
+import validations  # noqa: E402
+from issues import IssueSet  # noqa: E402
+from synthetic import make_customer_frame  # noqa: E402
+
+TEMPLATE = "Customer Template"
+
+# Rows of the frame after which a blank row is written
+BLANK_AFTER = [0, 1, 2, 10]
+TRAILING_BLANK_ROWS = 3
+
+
+def write_xlsx(frame):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(list(frame.columns))
+    for position, row in enumerate(frame.astype(object).itertuples(index=False)):
+        sheet.append([None if value is None or value != value else value for value in row])
+        if position in BLANK_AFTER:
+            sheet.append([None] * len(frame.columns))
+    # Formatted but empty rows after the data, as spreadsheets often save them
+    for row in range(sheet.max_row + 1, sheet.max_row + 1 + TRAILING_BLANK_ROWS):
+        sheet.cell(row, 1).font = Font(bold=True)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--chunksize", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    # openpyxl refuses control characters in cells
+    data = write_xlsx(make_customer_frame(args.rows, args.seed, {"control_characters": 0}))
+    plan = validations.PLANS[TEMPLATE]
+    results = {
+        engine: validations.run_plan(plan, ingest.read_file(io.BytesIO(data), "xlsx", engine=engine)).to_frame()
+        for engine in ingest.available_engines("xlsx")
+    }
+    state, chunked = {}, IssueSet()
+    for chunk in ingest.iter_chunks(io.BytesIO(data), "xlsx", chunksize=args.chunksize):
+        chunked.extend(validations.run_plan(plan, chunk, state))
+    results["chunks"] = chunked.to_frame()
+
+    # Chunked issues come chunk by chunk; only the rows matter
+    results = {
+        name: issues.sort_values(["rule", "column", "message", "row"], kind="stable").reset_index(drop=True)
+        for name, issues in results.items()
+    }
+    reference_name, reference = next(iter(results.items()))
+    print(", ".join(f"{name}: {len(issues):,} issues" for name, issues in results.items()))
+    for name, issues in results.items():
+        for column in reference.columns:
+            if not reference[column].astype(object).equals(issues[column].astype(object)):
+                print(f"{name} and {reference_name} differ in column {column!r}", file=sys.stderr)
+                return 1
+    print("Every engine reports the same rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Checks that exported workbooks keep cell values as plain text.
+
+Exports a frame holding formula-like ("=1+1", "@SUM(A1)") and URL-like
+values, plainly and annotated with an issue on every value, reads the
+workbooks back with openpyxl and checks that every value is a text cell with
+its original contents and no hyperlink. The only formulas allowed are the
+HYPERLINK formulas of the Errors sheet. Exits with status 1 on any
+difference.
+
+Example:
+    python benchmarks/check_exports.py
+"""
+import io
+import sys
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import exports  # noqa: E402
+from issues import IssueSet, make_issue  # noqa: E402
+
+VALUES = ["=1+1", "=HYPERLINK(\"https://example.com\",\"x\")", "@SUM(A1)", "https://example.com/a?b=1",
+          "mailto:someone@example.com", "00123"]
+
+
+def check_text_cells(sheet, expected, first_row=2, column=1):
+    """
+    Problems found in one column of a sheet read back with openpyxl.
+
+    Returns:
+        list: One message per cell that is not the expected text, empty when all are.
+    """
+    problems = []
+    for row, value in enumerate(expected, start=first_row):
+        cell = sheet.cell(row, column)
+        if cell.data_type != "s" or cell.value != value:
+            problems.append(f"{sheet.title}!{cell.coordinate}: {cell.value!r} ({cell.data_type}), expected {value!r}")
+        if cell.hyperlink is not None:
+            problems.append(f"{sheet.title}!{cell.coordinate}: links to {cell.hyperlink.target!r}")
+    return problems
+
+
+def main():
+    frame = pd.DataFrame({"value": VALUES}, dtype="str")
+    workbook = openpyxl.load_workbook(io.BytesIO(exports.export_frame(frame, "xlsx")))
+    problems = check_text_cells(workbook.active, VALUES)
+
+    issues = IssueSet()
+    issues.add(make_issue("format", frame["value"], "value", "is not allowed"))
+    workbook = openpyxl.load_workbook(io.BytesIO(exports.export_annotated(frame, issues, "xlsx")))
+    problems += check_text_cells(workbook["Data"], VALUES, column=len(exports.SUMMARY_COLUMNS) + 1)
+    errors_sheet = workbook["Errors"]
+    problems += check_text_cells(errors_sheet, VALUES, column=exports.ERRORS_SHEET_COLUMNS.index("value") + 1)
+    for row in range(2, len(VALUES) + 2):
+        link = errors_sheet.cell(row, 1)
+        if link.data_type != "f" or not str(link.value).startswith("=HYPERLINK("):
+            problems.append(f"Errors!{link.coordinate}: {link.value!r} is not a HYPERLINK formula")
+
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    if problems:
+        return 1
+    print("Exported values are plain text")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Checks that files of one batch run sharing an ID are not both recorded.
+
+Writes two clean Customer Template files whose IDs differ except for one
+row, runs the batch tool over both at once with --id-index --record-ids and
+checks that exactly one file passed and was recorded, while the other
+failed with an "imported" issue on the shared row. Exits with status 1
+otherwise.
+
+Example:
+    python benchmarks/check_id_index.py --rows 5000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Verdicts cached on disk are not what this checks
+os.environ.setdefault("IMPORT_WIZARD_VERDICT_CACHE_SIZE", "0")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import cli  # noqa: E402
+import id_index  # noqa: E402
+from synthetic import DEFAULT_ERROR_RATES, make_customer_frame  # noqa: E402
+
+TEMPLATE = "Customer Template"
+
+# Row of the second file that keeps the ID it has in the first
+SHARED_ROW = 7
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000)
+    args = parser.parse_args(argv)
+
+    clean = {kind: 0 for kind in DEFAULT_ERROR_RATES}
+    first = make_customer_frame(args.rows, 0, clean)
+    second = make_customer_frame(args.rows, 1, clean)
+    for column in id_index.key_columns(TEMPLATE):
+        shared = second[column].iloc[SHARED_ROW]
+        second[column] = "B-" + second[column]
+        second.loc[second.index[SHARED_ROW], column] = shared
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        (directory / "in").mkdir()
+        first.to_csv(directory / "in" / "first.csv", index=False)
+        second.to_csv(directory / "in" / "second.csv", index=False)
+        cli.main([
+            str(directory / "in"), "--output-dir", str(directory / "out"), "--template", TEMPLATE,
+            "--workers", "2", "--id-index", "--record-ids", "--id-index-dir", str(directory / "index"),
+        ])
+        summaries = json.loads((directory / "out" / "summary.json").read_text(encoding="utf-8"))
+        batches = id_index.IdIndex(TEMPLATE, directory / "index").batches()["name"].tolist()
+        reports = {
+            Path(summary["file"]).stem: json.loads(
+                (directory / "out" / f"{Path(summary['file']).stem}.errors.json").read_text(encoding="utf-8")
+            )
+            for summary in summaries
+        }
+
+    passed = [Path(summary["file"]).name for summary in summaries if summary["status"] == "passed"]
+    print(f"Passed: {passed}, recorded: {batches}")
+    if len(passed) != 1 or batches != passed:
+        print("Expected exactly one file to pass and be recorded", file=sys.stderr)
+        return 1
+    failed = next(report for name, report in reports.items() if f"{name}.csv" not in passed)
+    rows = {(error["rule"], error["row"]) for error in failed["errors"]}
+    expected = {("imported", SHARED_ROW + 2)}
+    if rows != expected:
+        print(f"The other file reported {sorted(rows)}, expected {sorted(expected)}", file=sys.stderr)
+        return 1
+    print("Only one of the overlapping files was recorded")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
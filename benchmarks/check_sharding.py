@@ -0,0 +1,63 @@
+"""
+Checks that sharded validation reports exactly the issues of a single pass.
+
+Runs the Customer Template plan over synthetic data with `run_plan` and with
+`run_sharded`, against a subsidiary reference tree written to a temporary
+directory so the hierarchy rule runs too, and compares the issue tables row
+for row. Exits with status 1 on any difference.
+
+Example:
+    python benchmarks/check_sharding.py --rows 120000 --workers 2
+"""
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# The reference tree leaves out one synthetic subsidiary, so the hierarchy rule reports issues.
+# Shard workers import this script again as "__mp_main__" and inherit the directory instead.
+if __name__ == "__main__":
+    _reference_dir = tempfile.mkdtemp()
+    (Path(_reference_dir) / "subsidiaries.txt").write_text("Parent Company : Egypt\nParent Company : UAE\n")
+    os.environ["IMPORT_WIZARD_REFERENCE_DIR"] = _reference_dir
+# Verdicts cached on disk must not hide differences between the two runs
+os.environ.setdefault("IMPORT_WIZARD_VERDICT_CACHE_SIZE", "0")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import validations  # noqa: E402
+from synthetic import make_customer_frame  # noqa: E402
+
+TEMPLATE = "Customer Template"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=120_000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    frame = make_customer_frame(args.rows, args.seed)
+    # Shard even small frames
+    validations.MIN_SHARD_ROWS = min(validations.MIN_SHARD_ROWS, max(args.rows // args.workers, 1))
+    single = validations.run_plan(validations.PLANS[TEMPLATE], frame).to_frame()
+    sharded = validations.run_sharded(TEMPLATE, frame, workers=args.workers).to_frame()
+
+    hierarchy_rows = int((single["rule"] == "hierarchy").sum())
+    print(f"{len(single):,} issues in one pass, {len(sharded):,} sharded ({hierarchy_rows:,} hierarchy)")
+    if not hierarchy_rows:
+        print("The hierarchy rule reported nothing; the check does not cover it", file=sys.stderr)
+        return 1
+    for column in single.columns:
+        if not single[column].astype(object).reset_index(drop=True).equals(
+            sharded[column].astype(object).reset_index(drop=True)
+        ):
+            print(f"Sharded issues differ in column {column!r}", file=sys.stderr)
+            return 1
+    print("Sharded issues match")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+Compares the reader engines in `ingest` on a synthetic customer file.
+
+Prints the load time and the memory of the resulting DataFrame per engine.
+
+Example:
+    python benchmarks/ingest_engines.py --rows 1000000
+"""
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import ingest  # noqa: E402
+from synthetic import make_customer_frame  # noqa: E402
+
+
+def measure(read):
+    start = time.perf_counter()
+    frame = read()
+    elapsed = time.perf_counter() - start
+    return elapsed, frame.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000, help="Rows in the CSV file.")
+    parser.add_argument("--xlsx-rows", type=int, default=50_000, help="Rows in the Excel file.")
+    args = parser.parse_args(argv)
+
+    frame = make_customer_frame(args.rows)
+    csv_bytes = frame.to_csv(index=False).encode("utf-8")
+    xlsx_buffer = io.BytesIO()
+    frame.head(args.xlsx_rows).to_excel(xlsx_buffer, index=False)
+    xlsx_bytes = xlsx_buffer.getvalue()
+
+    # The object-dtype reader the app used before the engine layer, as the baseline
+    baselines = {
+        "csv": lambda: pd.read_csv(io.BytesIO(csv_bytes), dtype=object),
+        "xlsx": lambda: pd.read_excel(io.BytesIO(xlsx_bytes), dtype=object),
+    }
+    files = {"csv": (csv_bytes, args.rows), "xlsx": (xlsx_bytes, min(args.rows, args.xlsx_rows))}
+
+    print(f"{'file':<6}{'engine':<22}{'rows':>10}{'seconds':>10}{'MiB':>10}")
+    for file_extension, (data, rows) in files.items():
+        results = [("baseline (object)", *measure(baselines[file_extension]))]
+        for engine in ingest.available_engines(file_extension):
+            results.append((engine, *measure(
+                lambda: ingest.read_file(io.BytesIO(data), file_extension, engine=engine)
+            )))
+        for engine, seconds, memory in results:
+            print(f"{file_extension:<6}{engine:<22}{rows:>10,}{seconds:>10.2f}{memory:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Times and memory-profiles the main stages on synthetic Customer Template data.
+
+Stages: reading the CSV and Excel files, renaming countries, column
+statistics, every rule of the Customer Template plan on its own, cleaning
+weird characters and the plain and error-annotated xlsx exports. Each stage
+runs at every size and is compared with the stored baseline; the run fails
+when a stage got slower, or needs more memory, than its baseline by more
+than --threshold. Baselines are absolute timings of the machine that
+recorded them: record them again with --save-baseline on every machine
+before comparing.
+
+Examples:
+    python benchmarks/suite.py                          # compare with benchmarks/baselines.json
+    python benchmarks/suite.py --save-baseline          # record new baselines
+    python benchmarks/suite.py --sizes 1000 5000000 --stages read_csv export_xlsx
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Rules are timed cold: verdicts cached on disk by earlier runs would hide their cost
+os.environ.setdefault("IMPORT_WIZARD_VERDICT_CACHE_SIZE", "0")
+import column_stats  # noqa: E402
+import countries  # noqa: E402
+import exports  # noqa: E402
+import ingest  # noqa: E402
+import phones  # noqa: E402
+import weird_characters  # noqa: E402
+from synthetic import make_customer_frame  # noqa: E402
+from validations import PLANS, VALIDATIONS, ColumnCache  # noqa: E402
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baselines.json"
+DEFAULT_SIZES = [1_000, 100_000]
+DEFAULT_THRESHOLD = 0.3
+
+# Differences below these are timer and allocator noise, never regressions. Sub-second stages
+# (1k rows, or xlsx files with their fixed workbook cost) vary by a tenth of a second between runs.
+MIN_REGRESSION_SECONDS = 0.25
+MIN_REGRESSION_MIB = 1.0
+
+# Excel files above this many rows take minutes just to generate
+XLSX_MAX_ROWS = 200_000
+
+COUNTRY_COLUMNS = ["Address1_country", "Address2_country"]
+TEXT_COLUMNS = ["companyName", "firstName", "lastName", "Address1_line1", "Address1_city"]
+
+
+def build_stages(rows, seed):
+    """
+    Benchmark stages for one size.
+
+    Returns:
+        dict: Stage name -> function running the stage once.
+    """
+    frame = make_customer_frame(rows, seed)
+    csv_bytes = frame.to_csv(index=False).encode("utf-8")
+    data = ingest.read_file(io.BytesIO(csv_bytes), "csv")
+
+    stages = {"read_csv": lambda: ingest.read_file(io.BytesIO(csv_bytes), "csv")}
+    if rows <= XLSX_MAX_ROWS:
+        xlsx_bytes = exports.export_frame(frame, "xlsx")
+        stages["read_xlsx"] = lambda: ingest.read_file(io.BytesIO(xlsx_bytes), "xlsx")
+
+    def rename_all_countries():
+        renamed = data
+        for column in COUNTRY_COLUMNS:
+            renamed = countries.rename_countries(renamed, column)
+        return renamed
+
+    stages["rename_countries"] = rename_all_countries
+    stages["column_stats"] = lambda: column_stats.profile_columns(data)
+
+    # Rules are validated after country renaming, as in the batch tool
+    renamed = rename_all_countries()
+    for step in PLANS["Customer Template"]:
+        if all(column in renamed.columns for column in step.required):
+            # A fresh cache per run, so each rule pays for the derived values it needs
+            stages[f"rule.{step.rule}.{step.column}"] = (
+                lambda step=step: step.check(ColumnCache(renamed), None)
+            )
+
+    stages["clean_columns"] = lambda: weird_characters.clean_columns(data, TEXT_COLUMNS, "Arabic")
+    stages["export_xlsx"] = lambda: exports.export_frame(data, "xlsx")
+    issues = VALIDATIONS["Customer Template"](renamed)
+    stages["export_annotated_xlsx"] = lambda: exports.export_annotated(renamed, issues, "xlsx")
+    return stages
+
+
+def _reset_caches():
+    # Phone verdicts are memoized per process; every run starts cold
+    phones.check_phone_number.cache_clear()
+    gc.collect()
+
+
+def measure(stage, repeat, memory=True):
+    """
+    Best wall time of `repeat` runs and, in one extra traced run, the peak of
+    the memory allocated through Python and NumPy (Arrow buffers are not traced).
+
+    Returns:
+        tuple: (seconds, peak MiB or None)
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        _reset_caches()
+        start = time.perf_counter()
+        stage()
+        best = min(best, time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        _reset_caches()
+        tracemalloc.start()
+        try:
+            stage()
+            peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def regressed(value, baseline, threshold, minimum):
+    if value is None or baseline is None:
+        return False
+    return value > baseline * (1 + threshold) and value - baseline > minimum
+
+
+def _format(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Row counts to run at.")
+    parser.add_argument("--stages", nargs="+", help="Only run stages whose name starts with one of these.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown or memory growth over the baseline, as a fraction.")
+    parser.add_argument("--baseline-file", type=Path, default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baselines.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced memory runs.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    baselines = json.loads(args.baseline_file.read_text()) if args.baseline_file.exists() else {}
+    failures = []
+
+    print(f"{'stage':<36}{'rows':>10}{'seconds':>10}{'baseline':>10}{'peak MiB':>10}{'baseline':>10}  status")
+    for rows in args.sizes:
+        stages = build_stages(rows, args.seed)
+        size_baselines = baselines.setdefault(str(rows), {})
+        for name, stage in stages.items():
+            if args.stages and not name.startswith(tuple(args.stages)):
+                continue
+            seconds, peak = measure(stage, repeat=5 if rows <= 10_000 else 1, memory=not args.no_memory)
+
+            baseline = size_baselines.get(name, {})
+            base_seconds, base_peak = baseline.get("seconds"), baseline.get("peak_mib")
+            status = "new" if not baseline else "ok"
+            if regressed(seconds, base_seconds, args.threshold, MIN_REGRESSION_SECONDS):
+                status = "SLOWER"
+            elif regressed(peak, base_peak, args.threshold, MIN_REGRESSION_MIB):
+                status = "MORE MEMORY"
+            if status in ("SLOWER", "MORE MEMORY"):
+                failures.append((name, rows, status))
+
+            print(
+                f"{name:<36}{rows:>10,}{seconds:>10.3f}{_format(base_seconds, '.3f'):>10}"
+                f"{_format(peak, '.1f'):>10}{_format(base_peak, '.1f'):>10}  {status}"
+            )
+            if args.save_baseline:
+                size_baselines[name] = {"seconds": round(seconds, 4)}
+                if peak is not None:
+                    size_baselines[name]["peak_mib"] = round(peak, 2)
+
+    if args.save_baseline:
+        args.baseline_file.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Baselines saved to {args.baseline_file}")
+        return 0
+    if failures:
+        print(f"{len(failures)} stages regressed beyond {args.threshold:.0%}:", file=sys.stderr)
+        for name, rows, status in failures:
+            print(f"  {name} at {rows:,} rows: {status}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+Synthetic Customer Template data with a controlled error rate per rule.
+
+Example:
+    python benchmarks/synthetic.py 100000 customers.csv --error-rate email=0.1
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Share of rows broken for each kind of error (arabic is the share of Arabic text, not an error)
+DEFAULT_ERROR_RATES = {
+    "email": 0.02,
+    "phone": 0.02,
+    "max_length": 0.01,
+    "unique": 0.01,
+    "country": 0.01,
+    "boolean": 0.01,
+    "required": 0.01,
+    "format": 0.01,
+    "control_characters": 0.005,
+    "arabic": 0.2,
+}
+
+COMPANIES = ["Acme Trading LLC", "Globex Corporation", "Initech", "Nile Logistics", "Gulf Foods Co."]
+ARABIC_COMPANIES = ["شركة النور للتجارة", "مؤسسة الخليج", "شركة النيل للنقل", "مصنع الأمل"]
+FIRST_NAMES = ["Ahmed", "Sara", "John", "Mona", "Omar", "Lina"]
+ARABIC_FIRST_NAMES = ["أحمد", "سارة", "محمد", "منى"]
+LAST_NAMES = ["Hassan", "Smith", "Ali", "Khalil", "Brown"]
+CITIES = ["Cairo", "Riyadh", "Dubai", "Amman", "London"]
+ARABIC_CITIES = ["القاهرة", "الرياض", "دبي", "عمان"]
+STREETS = ["12 Nile St", "Building 4, King Fahd Rd", "Office 301, Sheikh Zayed Rd", "221B Baker St"]
+# Valid country names and phone numbers valid in them, international and national
+COUNTRY_PHONES = [
+    ("Egypt", "+20 100 123 4567"), ("Egypt", "0100 123 4567"), ("Saudi Arabia", "+966 50 123 4567"),
+    ("Saudi Arabia", "050 123 4567"), ("United Arab Emirates", "+971 50 123 4567"),
+    ("United Arab Emirates", "050 123 4567"), ("United States", "+1 650 253 0000"),
+    ("United Kingdom", "+44 20 7946 0958"),
+]
+COUNTRIES = list(dict.fromkeys(country for country, _ in COUNTRY_PHONES))
+SUBSIDIARIES = ["Parent Company", "Parent Company : Egypt", "Parent Company : KSA : Riyadh"]
+TERMS = ["Net 30", "Net 60", "Due on receipt"]
+CURRENCIES = ["USD", "EGP", "SAR", "AED"]
+
+BAD_EMAILS = ["not-an-email", "user@@example.com", "user@example", "first last@example.com"]
+BAD_PHONES = ["12345", "phone", "+999 1", "00"]
+UNKNOWN_COUNTRIES = ["Atlantis", "Untied States", "XX", "Egipt"]
+BAD_BOOLEANS = ["yes", "1", "maybe"]
+BAD_SUBSIDIARIES = ["Parent Company|:Egypt", "Parent Company : ", "|"]
+CONTROL_CHARACTERS = ["\x01", "\x0b", "​", "�"]
+
+
+def _pick(rng, values, rows):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), rows)]
+
+
+def _inject(rng, column, rate, bad_values):
+    # Replaces a `rate` share of the rows with values picked from `bad_values`
+    mask = rng.random(len(column)) < rate
+    column[mask] = _pick(rng, bad_values, int(mask.sum()))
+    return mask
+
+
+def make_customer_frame(rows, seed=0, error_rates=None):
+    """
+    Builds a Customer Template DataFrame of string columns.
+
+    Parameters:
+        rows (int): Number of rows.
+        seed (int): Random seed; the same seed gives the same frame.
+        error_rates (dict): Overrides of DEFAULT_ERROR_RATES.
+
+    Returns:
+        pd.DataFrame
+    """
+    rates = {**DEFAULT_ERROR_RATES, **(error_rates or {})}
+    rng = np.random.default_rng(seed)
+    numbers = pd.Series(np.arange(rows)).astype(str).str.zfill(8)
+    arabic = rng.random(rows) < rates["arabic"]
+
+    external_ids = ("CUST-" + numbers).to_numpy(dtype=object)
+    duplicated = rng.random(rows) < rates["unique"]
+    external_ids[duplicated] = external_ids[rng.integers(0, rows, int(duplicated.sum()))]
+
+    is_person = _pick(rng, ["TRUE", "FALSE"], rows)
+    _inject(rng, is_person, rates["boolean"], BAD_BOOLEANS)
+
+    company = np.where(arabic, _pick(rng, ARABIC_COMPANIES, rows), _pick(rng, COMPANIES, rows))
+    _inject(rng, company, rates["max_length"], ["Company " + "X" * 100])
+    first_name = np.where(arabic, _pick(rng, ARABIC_FIRST_NAMES, rows), _pick(rng, FIRST_NAMES, rows))
+    city = np.where(arabic, _pick(rng, ARABIC_CITIES, rows), _pick(rng, CITIES, rows))
+    line1 = _pick(rng, STREETS, rows)
+    for column in (company, line1):
+        dirty = rng.random(rows) < rates["control_characters"]
+        column[dirty] = column[dirty] + _pick(rng, CONTROL_CHARACTERS, int(dirty.sum()))
+
+    pairs = rng.integers(0, len(COUNTRY_PHONES), rows)
+    country = np.asarray([country for country, _ in COUNTRY_PHONES], dtype=object)[pairs]
+    phone = np.asarray([phone for _, phone in COUNTRY_PHONES], dtype=object)[pairs]
+    _inject(rng, phone, rates["phone"], BAD_PHONES)
+    _inject(rng, country, rates["country"], UNKNOWN_COUNTRIES)
+
+    email = ("user" + numbers + "@example.com").to_numpy(dtype=object)
+    _inject(rng, email, rates["email"], BAD_EMAILS)
+
+    subsidiary = _pick(rng, SUBSIDIARIES, rows)
+    _inject(rng, subsidiary, rates["format"], BAD_SUBSIDIARIES)
+    _inject(rng, subsidiary, rates["required"], [None])
+
+    return pd.DataFrame({
+        "externalId": external_ids,
+        "entityId": ("C" + numbers).to_numpy(dtype=object),
+        "isPerson": is_person,
+        "companyName": company,
+        "firstName": first_name,
+        "lastName": _pick(rng, LAST_NAMES, rows),
+        "subsidiary": subsidiary,
+        "email": email,
+        "phone": phone,
+        "isInactive": _pick(rng, ["FALSE", "FALSE", "TRUE"], rows),
+        "currency": _pick(rng, CURRENCIES, rows),
+        "terms": _pick(rng, TERMS, rows),
+        "Address1_line1": line1,
+        "Address1_city": city,
+        "Address1_country": country,
+        "Address2_country": _pick(rng, COUNTRIES, rows),
+        "Address1_defaultBilling": _pick(rng, ["TRUE", "FALSE"], rows),
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("rows", type=int, help="Number of rows.")
+    parser.add_argument("output", help="CSV or xlsx file to write.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--error-rate", action="append", default=[], metavar="KIND=RATE",
+                        help=f"Override an error rate; kinds: {', '.join(DEFAULT_ERROR_RATES)}.")
+    args = parser.parse_args(argv)
+
+    error_rates = {}
+    for item in args.error_rate:
+        kind, _, rate = item.partition("=")
+        if kind not in DEFAULT_ERROR_RATES:
+            parser.error(f"unknown error kind: {kind}")
+        error_rates[kind] = float(rate)
+
+    frame = make_customer_frame(args.rows, args.seed, error_rates)
+    if args.output.endswith(".xlsx"):
+        frame.to_excel(args.output, index=False)
+    else:
+        frame.to_csv(args.output, index=False, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
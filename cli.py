@@ -0,0 +1,293 @@
+"""
+Headless batch validation of customer files.
+
+Runs country renaming, weird-character cleaning and template validation over
+every CSV/Excel file in a directory, one file per worker process, and writes a
+machine-readable error report per file. Streamlit is never imported.
+
+Example:
+    python cli.py incoming/ --output-dir reports --country-columns Address1_country Address2_country
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+import countries
+import emails
+import exports
+import id_index
+import ingest
+import mapping
+import profiling
+import weird_characters
+from issues import IssueSet
+from validations import VALIDATIONS, run_sharded, shard_executor
+
+SUPPORTED_EXTENSIONS = ("csv", "xlsx")
+
+
+def find_input_files(input_dir):
+    return sorted(
+        path for path in Path(input_dir).iterdir()
+        if path.is_file() and ingest.get_file_extension(path.name) in SUPPORTED_EXTENSIONS
+    )
+
+
+def write_error_report(report, summary, output_dir, file_stem, report_format):
+    if report_format == "parquet":
+        report.to_parquet(output_dir / f"{file_stem}.errors.parquet", index=False)
+    else:
+        document = dict(summary, errors=report.astype(object).where(report.notna(), None).to_dict("records"))
+        with open(output_dir / f"{file_stem}.errors.json", "w", encoding="utf-8") as file:
+            json.dump(document, file, ensure_ascii=False, indent=2, default=str)
+
+
+def read_chunks(path, options):
+    file_extension = ingest.get_file_extension(Path(path).name)
+    return ingest.iter_chunks(
+        path, file_extension, options["chunk_size"],
+        engine=options["csv_engine"] if file_extension == "csv" else None,
+        encoding=options["encoding"] if file_extension == "csv" else None,
+    )
+
+
+def find_imported_rows(path, options, index):
+    """
+    Reads a file again, renamed and cleaned as for validation, and reports
+    the rows whose IDs are in `index`.
+    """
+    issues = IssueSet()
+    for chunk in read_chunks(path, options):
+        if options["column_mapping"]:
+            chunk = chunk.rename(columns=options["column_mapping"])
+        clean_columns = [col for col in options["clean_columns"] if col in chunk.columns]
+        if clean_columns:
+            chunk, _ = weird_characters.clean_columns(chunk, clean_columns, options["language"])
+        issues.add(index.find_imported(chunk))
+    return issues
+
+
+def process_file(path, options):
+    """
+    Processes a single file and writes its error report.
+
+    Runs in a worker process, so it only takes picklable arguments and
+    returns a plain summary dict. With metrics on, the profiler records are
+    returned under "metrics".
+    """
+    path = Path(path)
+    output_dir = Path(options["output_dir"])
+    summary = {"file": str(path), "rows": 0, "error_count": 0, "weird_character_cells": 0, "status": "passed"}
+    profiler = profiling.NULL_PROFILER
+    if options["metrics"]:
+        profiler = profiling.Profiler(trace_memory=options["trace_memory"])
+        profiler.start()
+    shard_pool = None
+    try:
+        validation_function = VALIDATIONS[options["template"]]
+        if options["shard_workers"] > 1:
+            # One pool serves every chunk of the file
+            shard_pool = shard_executor(options["shard_workers"])
+            validation_function = partial(
+                run_sharded, options["template"], workers=options["shard_workers"], executor=shard_pool
+            )
+        if options["metrics"]:
+            validation_function = partial(validation_function, profiler=profiler)
+        index = id_index.IdIndex(options["template"], options["id_index_dir"]) if options["id_index"] else None
+        if index is not None:
+            validation_function = id_index.with_imported_check(validation_function, index)
+        # Key hashes of every chunk, recorded in one go once the whole file passed
+        exported_keys = {column: [] for column in id_index.key_columns(options["template"])}
+        unique_state = {}
+        data_path = output_dir / f"{path.stem}.processed.csv"
+        write_header = True
+
+        issues = IssueSet()
+        for chunk in profiler.iterate("read", read_chunks(path, options)):
+            if options["column_mapping"]:
+                chunk = chunk.rename(columns=options["column_mapping"])
+
+            # 1. Rename country codes and aliases
+            for country_column in options["country_columns"]:
+                if country_column in chunk.columns:
+                    with profiler.stage("rename_countries", len(chunk), 1):
+                        chunk = countries.rename_countries(chunk, country_column)
+
+            # 2. Clean weird characters
+            clean_columns = [col for col in options["clean_columns"] if col in chunk.columns]
+            if clean_columns:
+                with profiler.stage("clean_columns", len(chunk), len(clean_columns)):
+                    chunk, weird_cells = weird_characters.clean_columns(chunk, clean_columns, options["language"])
+                summary["weird_character_cells"] += len(weird_cells)
+
+            if options["normalize_emails"] and "email" in chunk.columns:
+                with profiler.stage("normalize_emails", len(chunk), 1):
+                    chunk["email_normalized"] = emails.normalize_emails(chunk["email"])
+
+            # 3. Validate
+            chunk_issues = validation_function(chunk, unique_state=unique_state)
+            issues.extend(chunk_issues)
+            summary["rows"] += len(chunk)
+            if options["record_ids"]:
+                for column, hashes in exported_keys.items():
+                    if column in chunk.columns:
+                        hashes.append(id_index.key_hashes(chunk[column])[0])
+
+            if options["write_data"]:
+                if options["annotate"]:
+                    chunk = exports.annotate_frame(chunk, chunk_issues)
+                with profiler.stage("write_data", len(chunk), len(chunk.columns)):
+                    chunk.to_csv(data_path, mode="w" if write_header else "a", header=write_header, index=False)
+                write_header = False
+
+        # 4. Remember the IDs of a clean file so later batches cannot import them again. Files of one
+        # run are validated in parallel, so with --id-index the IDs are checked again while recording:
+        # a file sharing IDs with one recorded in the meantime records nothing and reports those rows
+        if options["record_ids"] and not issues:
+            recorder = index or id_index.IdIndex(options["template"], options["id_index_dir"])
+            recorded = recorder.record_hashes(
+                path.name, {column: np.concatenate(hashes) for column, hashes in exported_keys.items() if hashes},
+                only_new=index is not None,
+            )
+            if recorded is None:
+                with profiler.stage("id_index", summary["rows"]):
+                    issues = find_imported_rows(path, options, recorder)
+            else:
+                summary["recorded_ids"] = recorded
+
+        with profiler.stage("error_report", summary["rows"]):
+            report = issues.to_frame()
+            summary["error_count"] = len(report)
+            if len(report):
+                summary["status"] = "failed"
+            write_error_report(report, summary, output_dir, path.stem, options["format"])
+    except Exception as e:
+        summary["status"] = "error"
+        summary["message"] = f"{type(e).__name__}: {e}"
+    finally:
+        if shard_pool is not None:
+            shard_pool.shutdown(cancel_futures=True)
+        profiler.stop()
+    if options["metrics"]:
+        summary["metrics"] = [dict(record, file=str(path)) for record in profiler.records]
+    return summary
+
+
+def write_metrics(records, output_dir, metrics_format):
+    """
+    Writes the stage timings of all files as metrics.json or metrics.prom.
+    """
+    if metrics_format == "prometheus":
+        path, text = Path(output_dir) / "metrics.prom", profiling.to_prometheus(records, labels=("file",))
+    else:
+        path, text = Path(output_dir) / "metrics.json", profiling.to_json(records, labels=("file",))
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
+    return path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Validate every CSV/Excel file in a directory.")
+    parser.add_argument("input_dir", help="Directory containing the files to validate.")
+    parser.add_argument("--output-dir", default="reports", help="Directory for the error reports.")
+    parser.add_argument("--template", default="Customer Template", choices=sorted(VALIDATIONS))
+    parser.add_argument("--format", default="json", choices=["json", "parquet"], help="Error report format.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes.")
+    parser.add_argument("--shard-workers", type=int, default=1,
+                        help="Worker processes validating row shards of each chunk; useful for a few large files.")
+    parser.add_argument("--chunk-size", type=int, default=ingest.DEFAULT_CHUNK_SIZE,
+                        help="Rows read per chunk within a file.")
+    parser.add_argument("--csv-engine", choices=ingest.available_engines("csv"),
+                        help="CSV reader; the fastest available when omitted.")
+    parser.add_argument("--encoding", help="CSV encoding; detected per file when omitted.")
+    parser.add_argument("--mapping", help="JSON file mapping source columns to template columns.")
+    parser.add_argument("--profile", help="Name of a mapping profile saved in the wizard for the template.")
+    parser.add_argument("--country-columns", nargs="*", default=[], help="Columns to run country renaming on.")
+    parser.add_argument("--clean-columns", nargs="*", default=[], help="Columns to clean weird characters from.")
+    parser.add_argument("--language", default="English", choices=list(weird_characters.LANGUAGE_PROFILES),
+                        help="Character profile used by --clean-columns.")
+    parser.add_argument("--normalize-emails", action="store_true",
+                        help="Add an email_normalized column to the processed data.")
+    parser.add_argument("--write-data", action="store_true",
+                        help="Also write the renamed/cleaned data as <file>.processed.csv.")
+    parser.add_argument("--annotate", action="store_true",
+                        help="With --write-data, add error_count and errors columns to the processed data.")
+    parser.add_argument("--id-index", action="store_true",
+                        help="Also report IDs already exported in earlier batches (see --record-ids).")
+    parser.add_argument("--record-ids", action="store_true",
+                        help="Add the IDs of every file that passed to the template's ID index.")
+    parser.add_argument("--id-index-dir", default=str(id_index.INDEX_DIR), help="Directory of the ID indexes.")
+    parser.add_argument("--metrics", choices=["json", "prometheus"],
+                        help="Record the time of every stage and rule, written as metrics.json or metrics.prom.")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="With --metrics, also record each stage's peak memory; slows processing down.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    files = find_input_files(args.input_dir)
+    if not files:
+        print(f"No CSV/Excel files found in {args.input_dir}", file=sys.stderr)
+        return 2
+
+    column_mapping = {}
+    if args.mapping:
+        with open(args.mapping, encoding="utf-8") as file:
+            column_mapping = json.load(file)
+    elif args.profile:
+        column_mapping = mapping.load_profile(args.template, args.profile)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    options = {
+        "output_dir": args.output_dir,
+        "template": args.template,
+        "format": args.format,
+        "chunk_size": args.chunk_size,
+        "csv_engine": args.csv_engine,
+        "encoding": args.encoding,
+        "column_mapping": column_mapping,
+        "country_columns": args.country_columns,
+        "clean_columns": args.clean_columns,
+        "language": args.language,
+        "normalize_emails": args.normalize_emails,
+        "write_data": args.write_data,
+        "annotate": args.annotate,
+        "shard_workers": args.shard_workers,
+        "id_index": args.id_index,
+        "record_ids": args.record_ids,
+        "id_index_dir": args.id_index_dir,
+        "metrics": args.metrics is not None,
+        "trace_memory": args.trace_memory,
+    }
+
+    summaries = []
+    metrics = []
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(files))) as executor:
+        futures = [executor.submit(process_file, str(path), options) for path in files]
+        for future in as_completed(futures):
+            summary = future.result()
+            metrics.extend(summary.pop("metrics", []))
+            summaries.append(summary)
+            line = f"[{summary['status']}] {summary['file']}: {summary['rows']} rows, {summary['error_count']} errors"
+            if "message" in summary:
+                line += f" ({summary['message']})"
+            print(line)
+
+    summaries.sort(key=lambda summary: summary["file"])
+    with open(Path(args.output_dir) / "summary.json", "w", encoding="utf-8") as file:
+        json.dump(summaries, file, ensure_ascii=False, indent=2)
+    if args.metrics:
+        print(f"Metrics written to {write_metrics(metrics, args.output_dir, args.metrics)}")
+
+    return 0 if all(summary["status"] == "passed" for summary in summaries) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
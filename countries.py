@@ -1,3 +1,12 @@
+import difflib
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from vocabularies import VALID_COUNTRIES
+
 COUNTRY_MAPPING = {
     "AF": "Afghanistan",
     "AL": "Albania",
@@ -248,6 +257,7 @@ COUNTRY_MAPPING = {
     "ZM": "Zambia",
     "ZW": "Zimbabwe",
     "AX": "Åland Islands",
+    "XK": "Kosovo",
     "UAE": "United Arab Emirates",
     "U.A.E.": "United Arab Emirates",
     "KSA": "Saudi Arabia",
@@ -270,8 +280,198 @@ COUNTRY_MAPPING = {
     "D.R.C.": "Congo (the Democratic Republic of the)"
 }
 
+# ISO 3166-1 alpha-3 and numeric codes per alpha-2 code (Kosovo's codes are user-assigned)
+ISO_CODES = {
+    "AF": ("AFG", "004"), "AL": ("ALB", "008"), "DZ": ("DZA", "012"), "AS": ("ASM", "016"), "AD": ("AND", "020"), "AO": ("AGO", "024"),
+    "AI": ("AIA", "660"), "AQ": ("ATA", "010"), "AG": ("ATG", "028"), "AR": ("ARG", "032"), "AM": ("ARM", "051"), "AW": ("ABW", "533"),
+    "AU": ("AUS", "036"), "AT": ("AUT", "040"), "AZ": ("AZE", "031"), "BS": ("BHS", "044"), "BH": ("BHR", "048"), "BD": ("BGD", "050"),
+    "BB": ("BRB", "052"), "BY": ("BLR", "112"), "BE": ("BEL", "056"), "BZ": ("BLZ", "084"), "BJ": ("BEN", "204"), "BM": ("BMU", "060"),
+    "BT": ("BTN", "064"), "BO": ("BOL", "068"), "BQ": ("BES", "535"), "BA": ("BIH", "070"), "BW": ("BWA", "072"), "BV": ("BVT", "074"),
+    "BR": ("BRA", "076"), "IO": ("IOT", "086"), "BN": ("BRN", "096"), "BG": ("BGR", "100"), "BF": ("BFA", "854"), "BI": ("BDI", "108"),
+    "CV": ("CPV", "132"), "KH": ("KHM", "116"), "CM": ("CMR", "120"), "CA": ("CAN", "124"), "KY": ("CYM", "136"), "CF": ("CAF", "140"),
+    "TD": ("TCD", "148"), "CL": ("CHL", "152"), "CN": ("CHN", "156"), "CX": ("CXR", "162"), "CC": ("CCK", "166"), "CO": ("COL", "170"),
+    "KM": ("COM", "174"), "CD": ("COD", "180"), "CG": ("COG", "178"), "CK": ("COK", "184"), "CR": ("CRI", "188"), "HR": ("HRV", "191"),
+    "CU": ("CUB", "192"), "CW": ("CUW", "531"), "CY": ("CYP", "196"), "CZ": ("CZE", "203"), "CI": ("CIV", "384"), "DK": ("DNK", "208"),
+    "DJ": ("DJI", "262"), "DM": ("DMA", "212"), "DO": ("DOM", "214"), "EC": ("ECU", "218"), "EG": ("EGY", "818"), "SV": ("SLV", "222"),
+    "GQ": ("GNQ", "226"), "ER": ("ERI", "232"), "EE": ("EST", "233"), "SZ": ("SWZ", "748"), "ET": ("ETH", "231"), "FK": ("FLK", "238"),
+    "FO": ("FRO", "234"), "FJ": ("FJI", "242"), "FI": ("FIN", "246"), "FR": ("FRA", "250"), "GF": ("GUF", "254"), "PF": ("PYF", "258"),
+    "TF": ("ATF", "260"), "GA": ("GAB", "266"), "GM": ("GMB", "270"), "GE": ("GEO", "268"), "DE": ("DEU", "276"), "GH": ("GHA", "288"),
+    "GI": ("GIB", "292"), "GR": ("GRC", "300"), "GL": ("GRL", "304"), "GD": ("GRD", "308"), "GP": ("GLP", "312"), "GU": ("GUM", "316"),
+    "GT": ("GTM", "320"), "GG": ("GGY", "831"), "GN": ("GIN", "324"), "GW": ("GNB", "624"), "GY": ("GUY", "328"), "HT": ("HTI", "332"),
+    "HM": ("HMD", "334"), "VA": ("VAT", "336"), "HN": ("HND", "340"), "HK": ("HKG", "344"), "HU": ("HUN", "348"), "IS": ("ISL", "352"),
+    "IN": ("IND", "356"), "ID": ("IDN", "360"), "IR": ("IRN", "364"), "IQ": ("IRQ", "368"), "IE": ("IRL", "372"), "IM": ("IMN", "833"),
+    "IL": ("ISR", "376"), "IT": ("ITA", "380"), "JM": ("JAM", "388"), "JP": ("JPN", "392"), "JE": ("JEY", "832"), "JO": ("JOR", "400"),
+    "KZ": ("KAZ", "398"), "KE": ("KEN", "404"), "KI": ("KIR", "296"), "KP": ("PRK", "408"), "KR": ("KOR", "410"), "KW": ("KWT", "414"),
+    "KG": ("KGZ", "417"), "LA": ("LAO", "418"), "LV": ("LVA", "428"), "LB": ("LBN", "422"), "LS": ("LSO", "426"), "LR": ("LBR", "430"),
+    "LY": ("LBY", "434"), "LI": ("LIE", "438"), "LT": ("LTU", "440"), "LU": ("LUX", "442"), "MO": ("MAC", "446"), "MG": ("MDG", "450"),
+    "MW": ("MWI", "454"), "MY": ("MYS", "458"), "MV": ("MDV", "462"), "ML": ("MLI", "466"), "MT": ("MLT", "470"), "MH": ("MHL", "584"),
+    "MQ": ("MTQ", "474"), "MR": ("MRT", "478"), "MU": ("MUS", "480"), "YT": ("MYT", "175"), "MX": ("MEX", "484"), "FM": ("FSM", "583"),
+    "MD": ("MDA", "498"), "MC": ("MCO", "492"), "MN": ("MNG", "496"), "ME": ("MNE", "499"), "MS": ("MSR", "500"), "MA": ("MAR", "504"),
+    "MZ": ("MOZ", "508"), "MM": ("MMR", "104"), "NA": ("NAM", "516"), "NR": ("NRU", "520"), "NP": ("NPL", "524"), "NL": ("NLD", "528"),
+    "NC": ("NCL", "540"), "NZ": ("NZL", "554"), "NI": ("NIC", "558"), "NE": ("NER", "562"), "NG": ("NGA", "566"), "NU": ("NIU", "570"),
+    "NF": ("NFK", "574"), "MP": ("MNP", "580"), "NO": ("NOR", "578"), "OM": ("OMN", "512"), "PK": ("PAK", "586"), "PW": ("PLW", "585"),
+    "PS": ("PSE", "275"), "PA": ("PAN", "591"), "PG": ("PNG", "598"), "PY": ("PRY", "600"), "PE": ("PER", "604"), "PH": ("PHL", "608"),
+    "PN": ("PCN", "612"), "PL": ("POL", "616"), "PT": ("PRT", "620"), "PR": ("PRI", "630"), "QA": ("QAT", "634"), "MK": ("MKD", "807"),
+    "RO": ("ROU", "642"), "RU": ("RUS", "643"), "RW": ("RWA", "646"), "RE": ("REU", "638"), "BL": ("BLM", "652"), "SH": ("SHN", "654"),
+    "KN": ("KNA", "659"), "LC": ("LCA", "662"), "MF": ("MAF", "663"), "PM": ("SPM", "666"), "VC": ("VCT", "670"), "WS": ("WSM", "882"),
+    "SM": ("SMR", "674"), "ST": ("STP", "678"), "SA": ("SAU", "682"), "SN": ("SEN", "686"), "RS": ("SRB", "688"), "SC": ("SYC", "690"),
+    "SL": ("SLE", "694"), "SG": ("SGP", "702"), "SX": ("SXM", "534"), "SK": ("SVK", "703"), "SI": ("SVN", "705"), "SB": ("SLB", "090"),
+    "SO": ("SOM", "706"), "ZA": ("ZAF", "710"), "GS": ("SGS", "239"), "SS": ("SSD", "728"), "ES": ("ESP", "724"), "LK": ("LKA", "144"),
+    "SD": ("SDN", "729"), "SR": ("SUR", "740"), "SJ": ("SJM", "744"), "SE": ("SWE", "752"), "CH": ("CHE", "756"), "SY": ("SYR", "760"),
+    "TW": ("TWN", "158"), "TJ": ("TJK", "762"), "TZ": ("TZA", "834"), "TH": ("THA", "764"), "TL": ("TLS", "626"), "TG": ("TGO", "768"),
+    "TK": ("TKL", "772"), "TO": ("TON", "776"), "TT": ("TTO", "780"), "TN": ("TUN", "788"), "TR": ("TUR", "792"), "TM": ("TKM", "795"),
+    "TC": ("TCA", "796"), "TV": ("TUV", "798"), "UG": ("UGA", "800"), "UA": ("UKR", "804"), "AE": ("ARE", "784"), "GB": ("GBR", "826"),
+    "UM": ("UMI", "581"), "US": ("USA", "840"), "UY": ("URY", "858"), "UZ": ("UZB", "860"), "VU": ("VUT", "548"), "VE": ("VEN", "862"),
+    "VN": ("VNM", "704"), "VG": ("VGB", "092"), "VI": ("VIR", "850"), "WF": ("WLF", "876"), "EH": ("ESH", "732"), "YE": ("YEM", "887"),
+    "ZM": ("ZMB", "894"), "ZW": ("ZWE", "716"), "AX": ("ALA", "248"),
+    "XK": ("XKX", None),
+}
+
+# Common spellings that are not official names, codes or aliases, mapped to the official name
+COUNTRY_VARIANTS = {
+    "United States of America": "United States", "America": "United States", "U.S.": "United States",
+    "Great Britain": "United Kingdom", "Britain": "United Kingdom", "England": "United Kingdom",
+    "Scotland": "United Kingdom", "Wales": "United Kingdom", "Northern Ireland": "United Kingdom",
+    "United Kingdom of Great Britain and Northern Ireland": "United Kingdom",
+    "South Korea": "Korea (the Republic of)", "Republic of Korea": "Korea (the Republic of)",
+    "Korea, Republic of": "Korea (the Republic of)", "Korea": "Korea (the Republic of)",
+    "North Korea": "Korea (the Democratic People's Republic of)",
+    "Korea, Democratic People's Republic of": "Korea (the Democratic People's Republic of)",
+    "Russia": "Russian Federation", "Iran": "Iran (Islamic Republic of)",
+    "Islamic Republic of Iran": "Iran (Islamic Republic of)", "Syria": "Syrian Arab Republic",
+    "Vietnam": "Viet Nam", "Turkey": "Türkiye", "Czech Republic": "Czechia", "Ivory Coast": "Côte d'Ivoire",
+    "Macau": "Macao", "Macao SAR": "Macao", "Hong Kong SAR": "Hong Kong",
+    "Laos": "Lao People's Democratic Republic", "Lao PDR": "Lao People's Democratic Republic",
+    "Bolivia": "Bolivia (Plurinational State of)", "Venezuela": "Venezuela (Bolivarian Republic of)",
+    "Tanzania": "Tanzania, the United Republic of", "Moldova": "Moldova (the Republic of)",
+    "Micronesia": "Micronesia (Federated States of)", "Palestine": "Palestine, State of",
+    "State of Palestine": "Palestine, State of", "Palestinian Territories": "Palestine, State of",
+    "Taiwan": "Taiwan (Province of China)", "Vatican": "Holy See", "Vatican City": "Holy See",
+    "Brunei": "Brunei Darussalam", "Cape Verde": "Cabo Verde", "Swaziland": "Eswatini",
+    "Macedonia": "North Macedonia", "Republic of North Macedonia": "North Macedonia", "Burma": "Myanmar",
+    "Holland": "Netherlands", "East Timor": "Timor-Leste",
+    "Democratic Republic of the Congo": "Congo (the Democratic Republic of the)",
+    "DR Congo": "Congo (the Democratic Republic of the)", "Congo-Kinshasa": "Congo (the Democratic Republic of the)",
+    "Congo (Kinshasa)": "Congo (the Democratic Republic of the)", "Republic of the Congo": "Congo",
+    "Congo-Brazzaville": "Congo", "Congo (Brazzaville)": "Congo", "Falkland Islands": "Falkland Islands (Malvinas)",
+    "Sao Tome": "Sao Tome and Principe", "Saint Martin": "Saint Martin (French part)",
+    "Sint Maarten": "Sint Maarten (Dutch part)", "British Virgin Islands": "Virgin Islands (British)",
+    "US Virgin Islands": "Virgin Islands (U.S.)", "Bahamas, The": "Bahamas", "Gambia, The": "Gambia",
+    "Kyrgyz Republic": "Kyrgyzstan", "Slovak Republic": "Slovakia", "Pitcairn Islands": "Pitcairn",
+    "Emirates": "United Arab Emirates", "Saudi": "Saudi Arabia",
+    # Arabic names of the countries most of our customers are in
+    "الإمارات العربية المتحدة": "United Arab Emirates", "الإمارات": "United Arab Emirates",
+    "المملكة العربية السعودية": "Saudi Arabia", "السعودية": "Saudi Arabia", "مصر": "Egypt", "الأردن": "Jordan",
+    "الكويت": "Kuwait", "قطر": "Qatar", "البحرين": "Bahrain", "عمان": "Oman", "سلطنة عمان": "Oman",
+    "لبنان": "Lebanon", "العراق": "Iraq", "سوريا": "Syrian Arab Republic", "اليمن": "Yemen", "المغرب": "Morocco",
+    "الجزائر": "Algeria", "تونس": "Tunisia", "ليبيا": "Libya", "السودان": "Sudan", "فلسطين": "Palestine, State of",
+    "الولايات المتحدة": "United States", "المملكة المتحدة": "United Kingdom", "الهند": "India",
+    "باكستان": "Pakistan", "تركيا": "Türkiye",
+}
+
+
+def fold_country(value):
+    """
+    Folds a country spelling to the key used by COUNTRY_INDEX.
+
+    Case, accents, punctuation, extra whitespace and the word "the" are
+    ignored, "St" is read as "Saint", and numeric codes are zero-padded, so
+    " côte d'Ivoire", "COTE D'IVOIRE" and "Cote dIvoire" fold to the same key.
+    """
+    text = str(value).strip()
+    # Numeric codes, also when Excel turned them into floats ("4.0" -> "004")
+    if re.fullmatch(r"\d{1,3}(\.0+)?", text):
+        return text.split(".")[0].zfill(3)
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char)).casefold()
+    text = re.sub(r"[.'’`]", "", text).replace("&", " and ")
+    tokens = re.sub(r"[^\w]+|_", " ", text).split()
+    return " ".join("saint" if token == "st" else token for token in tokens if token != "the")
+
+
+def _build_country_index():
+    # Earlier sources win when two spellings fold to the same key
+    index = {}
+    for name in VALID_COUNTRIES:
+        index.setdefault(fold_country(name), name)
+    for code, name in COUNTRY_MAPPING.items():
+        index.setdefault(fold_country(code), name)
+        alpha_3, numeric = ISO_CODES.get(code, (None, None))
+        for other_code in (alpha_3, numeric):
+            if other_code:
+                index.setdefault(fold_country(other_code), name)
+    for variant, name in COUNTRY_VARIANTS.items():
+        index.setdefault(fold_country(variant), name)
+    return index
+
+
+# Folded spelling -> official name, for every name, ISO code, alias and variant
+COUNTRY_INDEX = _build_country_index()
+
+
+def lookup_country(value):
+    """
+    Official name of a country spelling, or None when it is not recognized.
+    """
+    return COUNTRY_INDEX.get(fold_country(value))
+
+
+def suggest_countries(value, limit=3):
+    """
+    Official names closest to an unrecognized spelling, best match first.
+    """
+    matches = difflib.get_close_matches(fold_country(value), COUNTRY_INDEX, n=limit * 4, cutoff=0.6)
+    suggestions = []
+    for match in matches:
+        name = COUNTRY_INDEX[match]
+        if name not in suggestions:
+            suggestions.append(name)
+    return suggestions[:limit]
+
+
+def normalize_countries(column, suggestion_limit=3):
+    """
+    Replaces every recognized country spelling in a column with its official name.
+
+    Each distinct value is looked up once and the results are broadcast back
+    to the rows through the factorize codes, so the cost depends on the
+    number of distinct spellings, not on the number of rows. Unrecognized
+    values are kept as they are.
+
+    Parameters:
+        column (pd.Series): Country names or codes.
+        suggestion_limit (int): Maximum number of suggestions per unrecognized value.
+
+    Returns:
+        tuple: (normalized pd.Series, pd.DataFrame of the unrecognized values
+        with columns value, count and suggestions, most frequent first).
+    """
+    codes, uniques = pd.factorize(column)
+    uniques = list(uniques)
+    names = [lookup_country(value) for value in uniques]
+    normalized_uniques = [name if name is not None else value for name, value in zip(names, uniques)]
+
+    # Code -1 (missing) picks the trailing NaN
+    values = np.array(normalized_uniques + [np.nan], dtype=object)[codes]
+    normalized = pd.Series(values, index=column.index, name=column.name).astype(column.dtype)
+
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    unmapped = pd.DataFrame(
+        [
+            (value, int(counts[position]), suggest_countries(value, suggestion_limit))
+            for position, (value, name) in enumerate(zip(uniques, names))
+            if name is None
+        ],
+        columns=["value", "count", "suggestions"],
+    )
+    return normalized, unmapped.sort_values("count", ascending=False, ignore_index=True)
+
 
 # Helper function for renaming country abbreviations
 def rename_countries(data, country_column):
-    data[country_column] = data[country_column].replace(COUNTRY_MAPPING)
-    return data
\ No newline at end of file
+    """
+    Copy of `data` with the country spellings in `country_column` replaced by
+    their official names. The caller's frame is left unchanged.
+    """
+    normalized, _ = normalize_countries(data[country_column])
+    return data.assign(**{country_column: normalized})
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import email_validator
+from email_validator import validate_email, EmailNotValidError
+
+from verdict_cache import VerdictCache
+
+# Cheap syntax check run on all distinct values at once. It only rejects values
+# `validate_email` would reject too: no whitespace, exactly one @ and a dot in the domain.
+EMAIL_PREFILTER = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+
+# Bump when the checks below change, so verdicts cached by an older version are dropped
+RULE_VERSION = 1
+
+# Verdicts of `validate_email` that survive between uploads: (valid, normalized address)
+VERDICTS = VerdictCache("email", f"{RULE_VERSION}/email-validator {email_validator.__version__}")
+
+
+def check_emails(column):
+    """
+    Validates a column of email addresses.
+
+    Each distinct value is checked once: a vectorized regex rejects obviously
+    malformed values in bulk, `validate_email` runs on the distinct values that
+    pass it and are not in the VERDICTS cache yet, and the verdicts are
+    broadcast back to the rows through the factorize codes. Missing values are
+    neither valid nor invalid.
+
+    Parameters:
+        column (pd.Series): Email addresses.
+
+    Returns:
+        tuple: (boolean np.ndarray marking invalid rows,
+                pd.Series of normalized addresses, NaN where invalid or missing)
+    """
+    codes, uniques = pd.factorize(column)
+    uniques = pd.Series(uniques, dtype=object)
+
+    normalized_uniques = np.full(len(uniques), None, dtype=object)
+    plausible = uniques.str.match(EMAIL_PREFILTER).fillna(False).to_numpy(dtype=bool)
+    positions = np.flatnonzero(plausible)
+    values = uniques.iloc[positions].tolist()
+    cached = VERDICTS.get(values)
+    new_values, new_verdicts = [], []
+    for position, value, verdict in zip(positions, values, cached):
+        if verdict is None:
+            try:
+                verdict = True, validate_email(value, check_deliverability=False).normalized
+            except EmailNotValidError:
+                verdict = False, None
+            new_values.append(value)
+            new_verdicts.append(verdict)
+        normalized_uniques[position] = verdict[1]
+    VERDICTS.put(new_values, new_verdicts)
+
+    valid_uniques = normalized_uniques != None  # noqa: E711 - elementwise comparison
+    present = codes >= 0
+    invalid_mask = present & ~valid_uniques[codes]
+
+    # Code -1 (missing) picks the last slot of the padded array, which stays empty
+    normalized = np.append(normalized_uniques, None)[codes]
+    return invalid_mask, pd.Series(normalized, index=column.index, name=column.name)
+
+
+def normalize_emails(column):
+    """
+    Normalized form of each email address (lowercase domain, IDNA decoded),
+    NaN where the address is missing or invalid.
+    """
+    return check_emails(column)[1]
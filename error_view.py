@@ -0,0 +1,59 @@
+import math
+
+import numpy as np
+import streamlit as st
+
+PAGE_SIZES = [50, 100, 500, 1000]
+
+
+def render_issues(issues, key="issues"):
+    """
+    Shows an IssueSet as a per-rule summary and a single paginated error table.
+
+    Filtering works on the categorical codes of the issue table, and only the
+    rows of the visible page are sent to the browser.
+
+    Parameters:
+        issues (IssueSet): Validation issues to show.
+        key (str): Prefix for the widget keys, so several views can coexist.
+    """
+    st.write(f"❌ {len(issues):,} invalid values in {len(issues.columns())} columns:")
+    st.dataframe(issues.summary(), hide_index=True)
+
+    frame = issues.to_frame()
+    filter_columns = st.columns(3)
+    selected_columns = filter_columns[0].multiselect(
+        "Filter by column", frame["column"].cat.categories.tolist(), key=f"{key}_columns"
+    )
+    selected_rules = filter_columns[1].multiselect(
+        "Filter by rule", frame["rule"].cat.categories.tolist(), key=f"{key}_rules"
+    )
+    search = filter_columns[2].text_input("Search values", key=f"{key}_search")
+
+    mask = None
+    if selected_columns:
+        mask = _combine(mask, frame["column"].isin(selected_columns).to_numpy())
+    if selected_rules:
+        mask = _combine(mask, frame["rule"].isin(selected_rules).to_numpy())
+    if search:
+        matches = frame["value"].astype(str).str.contains(search, case=False, regex=False)
+        mask = _combine(mask, matches.to_numpy())
+    filtered = frame if mask is None else frame[mask]
+
+    page_size = st.selectbox("Rows per page", PAGE_SIZES, key=f"{key}_page_size")
+    page_count = max(1, math.ceil(len(filtered) / page_size))
+    page_key = f"{key}_page"
+    # Filters can shrink the table below the page that was open before
+    if st.session_state.get(page_key, 1) > page_count:
+        st.session_state[page_key] = 1
+    page = st.number_input(f"Page (of {page_count:,})", min_value=1, max_value=page_count, key=page_key)
+
+    start = (page - 1) * page_size
+    page_frame = filtered.iloc[start:start + page_size]
+    st.dataframe(page_frame.rename(columns={"row": "Row Index"}), hide_index=True)
+    if len(filtered):
+        st.caption(f"Showing {start + 1:,}–{start + len(page_frame):,} of {len(filtered):,} invalid values")
+
+
+def _combine(mask, condition):
+    return condition if mask is None else np.logical_and(mask, condition)
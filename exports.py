@@ -0,0 +1,196 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+try:
+    import xlsxwriter
+    from xlsxwriter.utility import quote_sheetname, xl_col_to_name
+except ImportError:  # xlsxwriter is optional; openpyxl is used without it
+    xlsxwriter = None
+
+from issues import ROW_OFFSET
+
+# File extension -> MIME type of the supported export formats
+EXPORT_FORMATS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Rows converted to Python values at a time by the streaming xlsx writer
+XLSX_BLOCK_SIZE = 10_000
+
+# xlsxwriter settings of exported workbooks: rows are flushed as they are written, and cell
+# values are kept as text, never turned into formulas ("=1+1") or hyperlinks ("https://...")
+WORKBOOK_OPTIONS = {
+    "constant_memory": True,
+    "nan_inf_to_errors": True,
+    "strings_to_formulas": False,
+    "strings_to_urls": False,
+}
+
+# Per-row error summary columns put in front of the data by annotated exports
+SUMMARY_COLUMNS = ["error_count", "errors"]
+ERRORS_SHEET_COLUMNS = ["row", "column", "rule", "message", "value"]
+
+# Excel's "Bad" cell style, used for the cells that failed validation
+ERROR_CELL_FORMAT = {"bg_color": "#FFC7CE", "font_color": "#9C0006"}
+
+
+def export_frame(frame, file_format="xlsx", sheet_name="Sheet1"):
+    """
+    Writes a DataFrame to an in-memory file.
+
+    Excel files are written with xlsxwriter in constant-memory mode when it is
+    installed, flushing each row as it is written instead of building the
+    whole workbook in memory. CSV files start with a UTF-8 BOM so Excel shows
+    Arabic text correctly.
+
+    Returns:
+        bytes: The file contents.
+    """
+    buffer = io.BytesIO()
+    if file_format == "xlsx":
+        if xlsxwriter is not None:
+            write_xlsx_streaming(frame, buffer, sheet_name)
+        else:
+            frame.to_excel(buffer, index=False, sheet_name=sheet_name)
+    elif file_format == "csv":
+        frame.to_csv(buffer, index=False, encoding="utf-8-sig")
+    elif file_format == "parquet":
+        frame.to_parquet(buffer, index=False)
+    else:
+        raise ValueError(f"Unsupported export format: {file_format}")
+    return buffer.getvalue()
+
+
+def _write_sheet(worksheet, frame, highlights=None, cell_format=None):
+    # Header and rows in order, as constant-memory mode requires; `highlights`
+    # maps a row position to the column positions rewritten with `cell_format`
+    worksheet.write_row(0, 0, [str(column) for column in frame.columns])
+    for start in range(0, len(frame), XLSX_BLOCK_SIZE):
+        block = frame.iloc[start:start + XLSX_BLOCK_SIZE]
+        values = block.astype(object).where(block.notna(), None).to_numpy()
+        for position, row in enumerate(values, start=start):
+            worksheet.write_row(position + 1, 0, row)
+            # Cells of the current row can still be rewritten before the next row is started
+            for column in highlights.get(position, ()) if highlights else ():
+                worksheet.write(position + 1, column, row[column], cell_format)
+
+
+def write_xlsx_streaming(frame, output, sheet_name="Sheet1"):
+    """
+    Writes a DataFrame row by row with xlsxwriter's constant-memory mode.
+
+    pandas' `to_excel` writes cells column by column, which constant-memory
+    mode cannot handle, so rows are written here in blocks of XLSX_BLOCK_SIZE.
+    Strings are written as text, so values such as IDs keep leading zeros
+    and values starting with "=" or looking like URLs stay plain text.
+    """
+    workbook = xlsxwriter.Workbook(output, WORKBOOK_OPTIONS)
+    _write_sheet(workbook.add_worksheet(sheet_name), frame)
+    workbook.close()
+
+
+def _issue_positions(frame, report):
+    # Row and column positions in `frame` of every issue cell; issues outside the frame are dropped
+    rows = frame.index.get_indexer(report["row"].to_numpy() - ROW_OFFSET)
+    columns = frame.columns.get_indexer(report["column"].astype(object))
+    found = (rows >= 0) & (columns >= 0)
+    return rows[found], columns[found], report[found]
+
+
+def annotate_frame(frame, issues):
+    """
+    Puts the SUMMARY_COLUMNS in front of a DataFrame: the number of issues of
+    each row and a "column: message" list of them.
+
+    Parameters:
+        frame (pd.DataFrame): The validated data, with the index and column
+            names the issues refer to.
+        issues (IssueSet): Validation issues of `frame`.
+
+    Returns:
+        pd.DataFrame
+    """
+    rows, _, report = _issue_positions(frame, issues.to_frame())
+    labels = (report["column"].astype(str) + ": " + report["message"].astype(str)).to_numpy(dtype=object)
+    order = np.argsort(rows, kind="stable")
+    summaries = pd.Series(labels[order]).groupby(rows[order]).agg("; ".join)
+
+    errors = np.full(len(frame), None, dtype=object)
+    errors[summaries.index.to_numpy()] = summaries.to_numpy()
+    return pd.concat([
+        pd.DataFrame(
+            {"error_count": np.bincount(rows, minlength=len(frame)), "errors": errors}, index=frame.index
+        ),
+        frame,
+    ], axis=1)
+
+
+def export_annotated(frame, issues, file_format="xlsx", sheet_name="Data"):
+    """
+    Writes the validated data with its validation issues.
+
+    Every format gets the per-row summary columns of `annotate_frame`. Excel
+    files also highlight each failing cell and get an "Errors" sheet with one
+    line per issue, whose row number links to the cell. The workbook is
+    streamed with xlsxwriter's constant-memory mode; without xlsxwriter it is
+    written without highlighting.
+
+    Returns:
+        bytes: The file contents.
+    """
+    annotated = annotate_frame(frame, issues)
+    if file_format != "xlsx":
+        return export_frame(annotated, file_format)
+
+    report = issues.to_frame().sort_values(["row", "column"], kind="stable")
+    rows, columns, report = _issue_positions(frame, report)
+    columns = columns + len(SUMMARY_COLUMNS)
+    errors = pd.DataFrame({
+        "row": report["row"].to_numpy(), "column": report["column"].astype(str).to_numpy(),
+        "rule": report["rule"].astype(str).to_numpy(), "message": report["message"].astype(str).to_numpy(),
+        "value": report["value"].to_numpy(),
+    }, columns=ERRORS_SHEET_COLUMNS)
+
+    buffer = io.BytesIO()
+    if xlsxwriter is None:
+        with pd.ExcelWriter(buffer) as writer:
+            annotated.to_excel(writer, index=False, sheet_name=sheet_name)
+            errors.to_excel(writer, index=False, sheet_name="Errors")
+        return buffer.getvalue()
+
+    workbook = xlsxwriter.Workbook(buffer, WORKBOOK_OPTIONS)
+    data_sheet = workbook.add_worksheet(sheet_name)
+    data_sheet.freeze_panes(1, 0)
+    data_sheet.autofilter(0, 0, len(annotated), len(annotated.columns) - 1)
+    # Failing cells per row position, for the rows that have any
+    highlights = pd.Series(columns).groupby(rows).agg(list).to_dict()
+    _write_sheet(data_sheet, annotated, highlights, workbook.add_format(ERROR_CELL_FORMAT))
+
+    # Row numbers link to the failing cell; HYPERLINK formulas have no per-sheet limit, unlike URLs.
+    # They are the only formulas of the workbook: data values are always written as text
+    links = (
+        f'=HYPERLINK("#{quote_sheetname(sheet_name)}!'
+        + pd.Series(columns).map(xl_col_to_name).to_numpy(dtype=object)
+        + errors["row"].astype(str).to_numpy(dtype=object) + '",'
+        + errors["row"].astype(str).to_numpy(dtype=object) + ")"
+    ) if len(errors) else []
+    errors_sheet = workbook.add_worksheet("Errors")
+    errors_sheet.freeze_panes(1, 0)
+    errors_sheet.autofilter(0, 0, len(errors), len(ERRORS_SHEET_COLUMNS) - 1)
+    link_format = workbook.add_format({"font_color": "blue", "underline": 1})
+    errors_sheet.write_row(0, 0, ERRORS_SHEET_COLUMNS)
+    details = errors.iloc[:, 1:]
+    values = details.astype(object).where(details.notna(), None).to_numpy()
+    for position, (link, row_number, row) in enumerate(zip(links, errors["row"].tolist(), values), start=1):
+        errors_sheet.write_formula(position, 0, link, link_format, row_number)
+        errors_sheet.write_row(position, 1, row)
+    workbook.close()
+    return buffer.getvalue()
+
+
+def export_file_name(file_stem, file_format):
+    return f"{file_stem}.{file_format}"
@@ -0,0 +1,194 @@
+import difflib
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from issues import make_issue
+
+# Directory of the reference trees; every "<name>.txt" becomes hierarchy "<name>"
+REFERENCE_DIR = Path(os.environ.get("IMPORT_WIZARD_REFERENCE_DIR", Path(__file__).parent / "reference"))
+
+# Separators of the levels of one path and of several paths in one cell, as in "Parent : Child|Other"
+LEVEL_SEPARATOR = ":"
+PATH_SEPARATOR = "|"
+
+# Candidates listed for an ambiguous name, and how close a path must be to be suggested
+MAX_CANDIDATES = 3
+SUGGESTION_CUTOFF = 0.6
+
+
+def _fold(name):
+    # Case and inner whitespace do not tell two names apart
+    return " ".join(name.split()).casefold()
+
+
+def split_path(path):
+    return [level.strip() for level in path.split(LEVEL_SEPARATOR)]
+
+
+class HierarchyIndex:
+    """
+    Prefix trie of the valid paths of a reference tree.
+
+    Every node is reached through the folded names of its ancestors, so a
+    full path is checked in one step per level. Leaf names are also indexed
+    on their own, which resolves a bare name to the one path that ends in it
+    or reports the paths it could mean.
+    """
+
+    def __init__(self, paths):
+        self._root = {}
+        # Folded name -> full paths whose last level has that name
+        self._names = {}
+        # Folded path or name -> full path, the candidates of suggestions
+        self._suggestions = {}
+        self.paths = []
+        for path in paths:
+            levels = split_path(path)
+            if not all(levels):
+                continue
+            node = self._root
+            for depth, level in enumerate(levels, start=1):
+                child = node.setdefault(_fold(level), {"path": None, "children": {}})
+                if child["path"] is None:
+                    # Intermediate levels are valid paths of their own
+                    child["path"] = f" {LEVEL_SEPARATOR} ".join(levels[:depth])
+                    self.paths.append(child["path"])
+                    self._names.setdefault(_fold(level), []).append(child["path"])
+                    self._suggestions.setdefault(_fold(child["path"]), child["path"])
+                    self._suggestions.setdefault(_fold(level), child["path"])
+                node = child["children"]
+
+    def __len__(self):
+        return len(self.paths)
+
+    def find(self, path):
+        """
+        The full path of the tree that `path` names, in the tree's spelling.
+
+        Returns:
+            str or None: None when the path is not in the tree.
+        """
+        node = {"children": self._root}
+        for level in split_path(path):
+            node = node["children"].get(_fold(level))
+            if node is None:
+                return None
+        return node["path"]
+
+    def resolve(self, name):
+        """
+        Full paths a single name can stand for: every path ending in it.
+        """
+        return list(self._names.get(_fold(name), []))
+
+    def suggest(self, path):
+        """
+        The valid path closest to `path`, or None when none is close enough.
+        """
+        folded = _fold(f" {LEVEL_SEPARATOR} ".join(split_path(path)))
+        close = difflib.get_close_matches(folded, self._suggestions, n=1, cutoff=SUGGESTION_CUTOFF)
+        return self._suggestions[close[0]] if close else None
+
+    def check(self, value):
+        """
+        Checks one cell, which may hold several paths.
+
+        Full paths must exist in the tree, and a bare name must end exactly
+        one path. Malformed paths (empty levels) are left to the format rule.
+
+        Returns:
+            str or None: The issue message, None when the value is valid.
+        """
+        for path in value.split(PATH_SEPARATOR):
+            levels = split_path(path)
+            if not all(levels):
+                continue
+            if self.find(path) is not None:
+                continue
+            candidates = self.resolve(path) if len(levels) == 1 else []
+            if len(candidates) == 1:
+                continue
+            if candidates:
+                shown = "; ".join(candidates[:MAX_CANDIDATES])
+                more = f" and {len(candidates) - MAX_CANDIDATES} more" if len(candidates) > MAX_CANDIDATES else ""
+                return f"is ambiguous, could be {shown}{more}"
+            suggestion = self.suggest(path)
+            return f"is not in the hierarchy (closest: {suggestion})" if suggestion else "is not in the hierarchy"
+        return None
+
+
+def read_reference(path):
+    """
+    Reads the paths of a reference tree: one "Parent : Child" path per line,
+    blank lines and lines starting with "#" skipped.
+    """
+    with open(path, encoding="utf-8-sig") as file:
+        return [line.strip() for line in file if line.strip() and not line.lstrip().startswith("#")]
+
+
+# Process-wide cache shared by all sessions: path -> (mtime_ns, size, HierarchyIndex)
+_index_cache = {}
+_cache_lock = threading.Lock()
+
+
+def reference_version(name, reference_dir=REFERENCE_DIR):
+    """
+    Modification time and size of a reference tree's file, None when it has none.
+    """
+    try:
+        stat = (Path(reference_dir) / f"{name}.txt").stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def get_index(name, reference_dir=REFERENCE_DIR):
+    """
+    Index of a reference tree, built once per process and rebuilt only when
+    its file changes.
+
+    Returns:
+        HierarchyIndex or None: None when there is no reference file for `name`.
+    """
+    path = Path(reference_dir) / f"{name}.txt"
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+
+    with _cache_lock:
+        cached = _index_cache.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    index = HierarchyIndex(read_reference(path))
+    with _cache_lock:
+        _index_cache[path] = (stat.st_mtime_ns, stat.st_size, index)
+    return index
+
+
+def validate_hierarchy(column, column_name, index):
+    """
+    Checks the paths of a column against a reference tree.
+
+    Each distinct value is checked once and the verdict is broadcast to its
+    rows, so the cost follows the number of distinct values, not of rows.
+    Missing values are left to the required rule.
+
+    Returns:
+        list: One Issue per distinct message, with rule "hierarchy".
+    """
+    if index is None:
+        return []
+    codes, uniques = pd.factorize(column, use_na_sentinel=True)
+    messages = np.array([index.check(str(value)) for value in uniques] + [None], dtype=object)
+    # Code -1 (missing) picks the trailing None
+    row_messages = messages[codes]
+    issues = []
+    for message in pd.unique(messages[pd.notna(messages)]):
+        issues.append(make_issue("hierarchy", column[row_messages == message], column_name, message))
+    return issues
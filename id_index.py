@@ -0,0 +1,237 @@
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from issues import Issue, IssueSet
+from template_rules import TEMPLATE_RULES
+
+# Directory holding one SQLite ID index per template
+INDEX_DIR = Path(os.environ.get("IMPORT_WIZARD_INDEX_DIR", Path(__file__).parent / "id_index"))
+
+# Keys sent to SQLite per statement batch, so a lookup never holds more than this many rows in flight
+LOOKUP_BATCH_SIZE = 500_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    exported_at REAL NOT NULL,
+    key_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keys (
+    column_name TEXT NOT NULL,
+    key_hash INTEGER NOT NULL,
+    batch_id INTEGER NOT NULL REFERENCES batches (id),
+    PRIMARY KEY (column_name, key_hash)
+) WITHOUT ROWID;
+"""
+
+
+def key_columns(template):
+    """
+    Columns of a template whose values must be unique across imports.
+    """
+    return list(TEMPLATE_RULES.get(template, {}).get("unique", []))
+
+
+def key_hashes(column):
+    """
+    64-bit hashes of the distinct non-missing values of a column.
+
+    Returns:
+        tuple: (int64 hash per distinct value, code per row into the hashes, -1 for missing values)
+    """
+    codes, uniques = pd.factorize(column, use_na_sentinel=True)
+    # pandas' hash is seeded with a fixed key, so the same value hashes the same in every run
+    hashes = pd.util.hash_array(np.asarray(uniques, dtype=object), categorize=False).view(np.int64)
+    return hashes, codes
+
+
+class IdIndex:
+    """
+    IDs already exported for one template, kept in a SQLite file.
+
+    Only 64-bit hashes of the IDs are stored, under the column they came from
+    and the export batch that brought them in, and lookups never read more
+    than the keys they ask for, so the index can grow to tens of millions of
+    IDs without being loaded into memory. Each export is recorded in a single
+    transaction: either all of its IDs are in the index or none are. The file
+    is opened in WAL mode so lookups keep working while an export is recorded.
+    """
+
+    def __init__(self, template, index_dir=INDEX_DIR):
+        self.template = template
+        safe_name = re.sub(r"[^\w\- ]+", "_", template).strip()
+        self.path = Path(index_dir) / f"{safe_name}.sqlite"
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def lookup(self, column_name, hashes):
+        """
+        Finds which of the given key hashes are already in the index.
+
+        Parameters:
+            column_name (str): Template column the keys belong to.
+            hashes (np.ndarray): int64 key hashes, see `key_hashes`.
+
+        Returns:
+            dict: Hash -> name of the batch that exported it, for the known hashes only.
+        """
+        found = {}
+        if not self.path.exists() or len(hashes) == 0:
+            return found
+        with closing(self._connect()) as connection:
+            connection.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (key_hash INTEGER PRIMARY KEY)")
+            for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+                # Sorted keys fill the temporary table and probe the index in B-tree order
+                part = np.sort(hashes[start:start + LOOKUP_BATCH_SIZE])
+                connection.execute("BEGIN")
+                connection.execute("DELETE FROM lookup")
+                connection.executemany("INSERT OR IGNORE INTO lookup VALUES (?)", zip(part.tolist()))
+                # One index probe per requested key
+                found.update(connection.execute(
+                    "SELECT keys.key_hash, batches.name FROM lookup "
+                    "JOIN keys ON keys.column_name = ? AND keys.key_hash = lookup.key_hash "
+                    "JOIN batches ON batches.id = keys.batch_id",
+                    (column_name,),
+                ))
+                connection.execute("COMMIT")
+        return found
+
+    def find_imported(self, dataframe, columns=None):
+        """
+        Checks the ID columns of a DataFrame against the earlier exports.
+
+        Parameters:
+            dataframe (pd.DataFrame): Data with template column names.
+            columns (list): ID columns to check; the template's unique columns when omitted.
+
+        Returns:
+            list: One Issue per column and earlier batch, with rule "imported".
+        """
+        issues = []
+        for column_name in columns if columns is not None else key_columns(self.template):
+            if column_name not in dataframe.columns:
+                continue
+            hashes, codes = key_hashes(dataframe[column_name])
+            found = self.lookup(column_name, hashes)
+            if not found:
+                continue
+            # Batch of every distinct value, broadcast to the rows through the factorize codes
+            batches = pd.Series(hashes).map(found).to_numpy(dtype=object)
+            row_batches = np.where(codes >= 0, batches[codes], None)
+            column = dataframe[column_name]
+            for batch_name in pd.unique(row_batches[pd.notna(row_batches)]):
+                imported = column[row_batches == batch_name]
+                issues.append(Issue(
+                    "imported", column_name, f"already imported in batch {batch_name}",
+                    imported.index.to_numpy(), imported.to_numpy(dtype=object),
+                ))
+        return issues
+
+    def record_hashes(self, batch_name, hashes_by_column, only_new=False):
+        """
+        Records the key hashes of one confirmed export in a single transaction.
+
+        Keys already in the index keep the batch that first exported them.
+        With `only_new`, the keys are checked again under the write lock and
+        nothing is recorded when any of them is known, so of two batches
+        checked at the same time only the first to be recorded keeps shared IDs.
+
+        Parameters:
+            batch_name (str): Name shown in the errors of later batches, e.g. the file name.
+            hashes_by_column (dict): Column name -> int64 key hashes.
+            only_new (bool): Record nothing when a key is already in the index.
+
+        Returns:
+            int or None: Number of keys that were new to the index; None when
+            `only_new` kept the batch from being recorded.
+        """
+        with closing(self._connect()) as connection:
+            # IMMEDIATE takes the write lock up front, so concurrent exports queue instead of failing
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                if only_new and self._any_known(connection, hashes_by_column):
+                    connection.execute("ROLLBACK")
+                    return None
+                batch_id = connection.execute(
+                    "INSERT INTO batches (name, exported_at, key_count) VALUES (?, ?, 0)",
+                    (batch_name, time.time()),
+                ).lastrowid
+                before = connection.total_changes
+                for column_name, hashes in hashes_by_column.items():
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO keys (column_name, key_hash, batch_id) VALUES (?, ?, ?)",
+                        ((column_name, key_hash, batch_id) for key_hash in np.unique(hashes).tolist()),
+                    )
+                added = connection.total_changes - before
+                connection.execute("UPDATE batches SET key_count = ? WHERE id = ?", (added, batch_id))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return added
+
+    @staticmethod
+    def _any_known(connection, hashes_by_column):
+        connection.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (key_hash INTEGER PRIMARY KEY)")
+        for column_name, hashes in hashes_by_column.items():
+            for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+                connection.execute("DELETE FROM lookup")
+                part = np.sort(hashes[start:start + LOOKUP_BATCH_SIZE])
+                connection.executemany("INSERT OR IGNORE INTO lookup VALUES (?)", zip(part.tolist()))
+                if connection.execute(
+                    "SELECT 1 FROM lookup JOIN keys ON keys.column_name = ? AND keys.key_hash = lookup.key_hash "
+                    "LIMIT 1",
+                    (column_name,),
+                ).fetchone():
+                    return True
+        return False
+
+    def record_export(self, batch_name, dataframe, columns=None):
+        """
+        Records the IDs of an exported DataFrame, see `record_hashes`.
+        """
+        columns = columns if columns is not None else key_columns(self.template)
+        return self.record_hashes(batch_name, {
+            column_name: key_hashes(dataframe[column_name])[0]
+            for column_name in columns if column_name in dataframe.columns
+        })
+
+    def batches(self):
+        """
+        The recorded exports, newest first.
+        """
+        if not self.path.exists():
+            return pd.DataFrame(columns=["name", "exported_at", "key_count"])
+        with closing(self._connect()) as connection:
+            batches = pd.read_sql_query(
+                "SELECT name, exported_at, key_count FROM batches ORDER BY id DESC", connection
+            )
+        batches["exported_at"] = pd.to_datetime(batches["exported_at"], unit="s")
+        return batches
+
+
+def with_imported_check(validation_function, index):
+    """
+    Wraps a template validation so it also reports IDs found in `index`.
+    The wrapped function takes the same arguments, e.g. for `validate_in_chunks`.
+    """
+    def validate(dataframe, *args, **kwargs):
+        errors = IssueSet()
+        errors.extend(validation_function(dataframe, *args, **kwargs))
+        errors.add(index.find_imported(dataframe))
+        return errors
+    return validate
@@ -0,0 +1,263 @@
+import codecs
+import importlib.util
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional; the pandas readers are used without it
+    pa = None
+
+# Number of rows held in memory at once when a file is validated in chunks
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Reader engines per file type, fastest first
+CSV_ENGINES = ["pyarrow", "pandas"]
+XLSX_ENGINES = ["calamine", "streaming", "openpyxl"]
+
+# Encoding assumed for CSVs that are not valid UTF-8 (Windows Arabic, used by legacy ERP exports)
+LEGACY_ENCODING = "cp1256"
+
+# Bytes inspected to detect the encoding of a CSV
+ENCODING_SAMPLE_SIZE = 1024 * 1024
+
+# Values read as missing, the same as the pandas CSV reader's defaults
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+
+def _arrow_string_dtype():
+    if pa is None:
+        return str
+    try:
+        # Arrow-backed strings with NaN as the missing value (pandas >= 2.3)
+        return pd.StringDtype("pyarrow", na_value=np.nan)
+    except TypeError:
+        return pd.StringDtype("pyarrow_numpy")
+
+
+# dtype of every column produced by the readers: Arrow-backed strings when pyarrow is installed
+STRING_DTYPE = _arrow_string_dtype()
+
+
+def get_file_extension(file_name):
+    return file_name.split('.')[-1].lower()
+
+
+def available_engines(file_extension):
+    """
+    Reader engines that can be used for a file type here, fastest first.
+    """
+    if file_extension == "csv":
+        return [engine for engine in CSV_ENGINES if engine != "pyarrow" or pa is not None]
+    elif file_extension == "xlsx":
+        return [
+            engine for engine in XLSX_ENGINES
+            if engine != "calamine" or importlib.util.find_spec("python_calamine") is not None
+        ]
+    raise ValueError(f"Unsupported file type: {file_extension}")
+
+
+def detect_encoding(sample):
+    """
+    Guesses the encoding of a CSV from its first bytes: a byte order mark,
+    else UTF-8 if the bytes decode as UTF-8, else LEGACY_ENCODING.
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    try:
+        # Not final, so a character cut off at the end of the sample is not an error
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return LEGACY_ENCODING
+
+
+def _read_sample(file):
+    if hasattr(file, "read"):
+        position = file.tell()
+        sample = file.read(ENCODING_SAMPLE_SIZE)
+        file.seek(position)
+        return sample
+    with open(file, "rb") as handle:
+        return handle.read(ENCODING_SAMPLE_SIZE)
+
+
+def read_file(file, file_extension, nrows=None, engine=None, encoding=None):
+    """
+    Reads a whole CSV/Excel file (or only its first `nrows` rows) as strings.
+
+    Parameters:
+        file: Path or file-like object.
+        file_extension (str): "csv" or "xlsx".
+        nrows (int): Only read the first `nrows` rows.
+        engine (str): One of `available_engines(file_extension)`; the fastest when omitted.
+        encoding (str): CSV encoding; detected from the file when omitted.
+
+    Returns:
+        pd.DataFrame with STRING_DTYPE columns.
+    """
+    engine = engine or available_engines(file_extension)[0]
+    if file_extension == "csv":
+        encoding = encoding or detect_encoding(_read_sample(file))
+        # The pyarrow reader has no row limit, previews use the pandas parser
+        if engine == "pyarrow" and nrows is None:
+            return _read_csv_pyarrow(file, encoding)
+        return pd.read_csv(file, dtype=STRING_DTYPE, nrows=nrows, encoding=encoding)
+    elif file_extension == "xlsx":
+        if engine == "streaming":
+            return _read_excel_streaming(file, nrows)
+        data = pd.read_excel(file, dtype=str, nrows=nrows, engine=engine)
+        return data.astype(STRING_DTYPE)
+    raise ValueError(f"Unsupported file type: {file_extension}")
+
+
+def iter_chunks(file, file_extension, chunksize=DEFAULT_CHUNK_SIZE, engine=None, encoding=None):
+    """
+    Reads a CSV/Excel file as a sequence of DataFrames of at most `chunksize` rows.
+
+    The index of every chunk continues from the previous one, so row numbers
+    reported for a chunk match the row numbers of the original file. Excel
+    files are always streamed with a read-only openpyxl reader.
+
+    Parameters:
+        file: Path or file-like object.
+        file_extension (str): "csv" or "xlsx".
+        chunksize (int): Maximum number of rows per chunk.
+        engine (str): CSV reader engine ("pyarrow" or "pandas"); the fastest when omitted.
+        encoding (str): CSV encoding; detected from the file when omitted.
+
+    Returns:
+        iterator of pd.DataFrame with STRING_DTYPE columns.
+    """
+    if file_extension == "csv":
+        engine = engine or available_engines(file_extension)[0]
+        encoding = encoding or detect_encoding(_read_sample(file))
+        if engine == "pyarrow":
+            yield from _iter_csv_chunks_pyarrow(file, chunksize, encoding)
+        else:
+            yield from pd.read_csv(file, dtype=STRING_DTYPE, chunksize=chunksize, encoding=encoding)
+    elif file_extension == "xlsx":
+        yield from _iter_excel_chunks(file, chunksize)
+    else:
+        raise ValueError(f"Unsupported file type: {file_extension}")
+
+
+def _csv_column_names(file, encoding):
+    # Header only, parsed by pandas so quoting and duplicate names match the pandas reader
+    columns = pd.read_csv(file, nrows=0, encoding=encoding).columns.tolist()
+    if hasattr(file, "seek"):
+        file.seek(0)
+    return columns
+
+
+def _pyarrow_csv_options(columns, encoding):
+    read_options = pa_csv.ReadOptions(encoding=encoding, column_names=columns, skip_rows=1)
+    # Quoted cells may span lines (e.g. multi-line addresses), as the pandas reader allows
+    parse_options = pa_csv.ParseOptions(newlines_in_values=True)
+    convert_options = pa_csv.ConvertOptions(
+        # Every column is read as text, so IDs and phone numbers keep their leading zeros
+        column_types={column: pa.string() for column in columns},
+        null_values=NA_VALUES,
+        strings_can_be_null=True,
+    )
+    return read_options, parse_options, convert_options
+
+
+def _arrow_to_pandas(table, start=0):
+    frame = table.to_pandas(types_mapper=lambda arrow_type: STRING_DTYPE if arrow_type == pa.string() else None)
+    frame.index = pd.RangeIndex(start, start + len(frame))
+    return frame
+
+
+def _read_csv_pyarrow(file, encoding):
+    columns = _csv_column_names(file, encoding)
+    read_options, parse_options, convert_options = _pyarrow_csv_options(columns, encoding)
+    table = pa_csv.read_csv(
+        file, read_options=read_options, parse_options=parse_options, convert_options=convert_options
+    )
+    return _arrow_to_pandas(table)
+
+
+def _iter_csv_chunks_pyarrow(file, chunksize, encoding):
+    columns = _csv_column_names(file, encoding)
+    read_options, parse_options, convert_options = _pyarrow_csv_options(columns, encoding)
+    reader = pa_csv.open_csv(
+        file, read_options=read_options, parse_options=parse_options, convert_options=convert_options
+    )
+
+    # Record batches are sized in bytes; regroup them into chunks of `chunksize` rows
+    batches, buffered, start = [], 0, 0
+    for batch in reader:
+        batches.append(batch)
+        buffered += batch.num_rows
+        while buffered >= chunksize:
+            table = pa.Table.from_batches(batches)
+            yield _arrow_to_pandas(table.slice(0, chunksize), start)
+            start += chunksize
+            remainder = table.slice(chunksize)
+            batches, buffered = remainder.to_batches(), remainder.num_rows
+    if buffered:
+        yield _arrow_to_pandas(pa.Table.from_batches(batches, schema=reader.schema), start)
+
+
+def _read_excel_streaming(file, nrows=None):
+    chunks = []
+    for chunk in _iter_excel_chunks(file, nrows or DEFAULT_CHUNK_SIZE):
+        chunks.append(chunk)
+        if nrows is not None:
+            break
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks)
+
+
+def _iter_excel_chunks(file, chunksize):
+    # Read-only mode streams the sheet XML instead of building the whole workbook
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [
+            str(name) if name is not None else f"Unnamed: {position}"
+            for position, name in enumerate(header)
+        ]
+
+        values, start = [], 0
+        for row in _sheet_rows(rows, len(columns)):
+            values.append(row)
+            if len(values) == chunksize:
+                yield _build_chunk(values, start, columns)
+                values, start = [], start + chunksize
+        if values:
+            yield _build_chunk(values, start, columns)
+    finally:
+        workbook.close()
+
+
+def _sheet_rows(rows, width):
+    # Blank rows inside the data are kept as missing values and trailing ones dropped, as
+    # read_excel does, so every engine numbers the rows alike
+    blank_rows = 0
+    for row in rows:
+        if all(cell is None for cell in row):
+            blank_rows += 1
+            continue
+        for _ in range(blank_rows):
+            yield [None] * width
+        blank_rows = 0
+        yield [str(cell) if cell is not None else None for cell in row[:width]]
+
+
+def _build_chunk(values, start, columns):
+    index = pd.RangeIndex(start, start + len(values))
+    return pd.DataFrame(values, index=index, columns=columns, dtype=STRING_DTYPE)
@@ -0,0 +1,128 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# Spreadsheet row number of the first data row (row 1 holds the headers)
+ROW_OFFSET = 2
+
+ISSUE_COLUMNS = ["rule", "column", "message", "row", "value"]
+
+
+class Issue(NamedTuple):
+    """
+    The offending cells found by one check on one column.
+
+    `rows` holds the DataFrame index labels of the cells and `values` their
+    contents, as two parallel arrays.
+    """
+    rule: str
+    column: str
+    message: str
+    rows: np.ndarray
+    values: np.ndarray
+
+
+def make_issue(rule, invalid, column_name, message):
+    """
+    Builds an Issue from the slice of a column that failed a check.
+
+    Returns:
+        Issue or None: None when `invalid` is empty.
+    """
+    if invalid.empty:
+        return None
+    return Issue(rule, column_name, message, invalid.index.to_numpy(), invalid.to_numpy(dtype=object))
+
+
+class IssueSet:
+    """
+    Columnar collection of validation issues.
+
+    Issues are kept as the arrays produced by each check and only
+    concatenated into a single table when `to_frame` is called.
+    """
+
+    def __init__(self):
+        self._issues = []
+        self._frame = None
+
+    def add(self, issue):
+        """
+        Adds an Issue, a list of Issues, or nothing (None).
+        """
+        if issue is None:
+            return
+        if isinstance(issue, Issue):
+            self._issues.append(issue)
+        else:
+            self._issues.extend(item for item in issue if item is not None)
+        self._frame = None
+
+    def extend(self, other):
+        self._issues.extend(other._issues)
+        self._frame = None
+
+    def __iter__(self):
+        return iter(self._issues)
+
+    def __len__(self):
+        return sum(len(issue.rows) for issue in self._issues)
+
+    def __bool__(self):
+        return bool(self._issues)
+
+    def columns(self):
+        """
+        Names of the columns with issues, in the order they were found.
+        """
+        return list(dict.fromkeys(issue.column for issue in self._issues))
+
+    def summary(self):
+        """
+        Number of offending cells per rule, column and message.
+        """
+        counts = {}
+        for issue in self._issues:
+            key = (issue.rule, issue.column, issue.message)
+            counts[key] = counts.get(key, 0) + len(issue.rows)
+        return pd.DataFrame(
+            [(*key, count) for key, count in counts.items()],
+            columns=["rule", "column", "message", "count"],
+        )
+
+    def to_frame(self):
+        """
+        All issues as one table with the columns in ISSUE_COLUMNS.
+
+        `row` is the spreadsheet row number of the cell. The rule, column and
+        message columns are categoricals, so the table stays compact.
+        """
+        if self._frame is not None:
+            return self._frame
+        if not self._issues:
+            self._frame = pd.DataFrame({
+                "rule": pd.Categorical([]),
+                "column": pd.Categorical([]),
+                "message": pd.Categorical([]),
+                "row": np.array([], dtype=np.int64),
+                "value": np.array([], dtype=object),
+            })
+            return self._frame
+
+        lengths = np.array([len(issue.rows) for issue in self._issues])
+        block = np.repeat(np.arange(len(self._issues)), lengths)
+        self._frame = pd.DataFrame({
+            "rule": self._block_categorical([issue.rule for issue in self._issues], block),
+            "column": self._block_categorical([issue.column for issue in self._issues], block),
+            "message": self._block_categorical([issue.message for issue in self._issues], block),
+            "row": np.concatenate([issue.rows for issue in self._issues]).astype(np.int64) + ROW_OFFSET,
+            "value": np.concatenate([issue.values for issue in self._issues]),
+        })
+        return self._frame
+
+    @staticmethod
+    def _block_categorical(labels, block):
+        # One label per issue block, broadcast to its rows through integer codes
+        categories, block_codes = np.unique(np.array(labels, dtype=object), return_inverse=True)
+        return pd.Categorical.from_codes(block_codes[block], categories=categories)
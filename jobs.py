@@ -0,0 +1,138 @@
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+
+# Jobs run at the same time across all sessions of the app; the rest wait in the queue
+MAX_WORKERS = int(os.environ.get("IMPORT_WIZARD_JOB_WORKERS", os.cpu_count() or 1))
+
+# Worker processes shared by all jobs that fan out to processes (e.g. sharded validation)
+MAX_PROCESSES = int(os.environ.get("IMPORT_WIZARD_PROCESS_WORKERS", os.cpu_count() or 1))
+
+# Processes come from a fork server (or are spawned where there is none): forking the app,
+# whose job threads may hold locks, could leave a child waiting on a lock nobody releases
+PROCESS_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+_executor = None
+_process_pool = None
+_executor_lock = threading.Lock()
+_job_ids = itertools.count(1)
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job when it was cancelled, at its next progress report.
+    """
+
+
+class Job:
+    """
+    A function running on the shared worker pool.
+
+    The function gets the Job as its first argument and reports its progress
+    through `report`, which is also where a cancelled job stops. Status,
+    progress, result and error can be polled from any thread.
+    """
+
+    def __init__(self, kind, function, args, kwargs):
+        self.id = next(_job_ids)
+        self.kind = kind
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self._function = function
+        self._args = args
+        self._kwargs = kwargs
+        self._cancel_requested = threading.Event()
+        self._future = None
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    def report(self, done, total, message=""):
+        """
+        Records that `done` of `total` units of work are finished.
+
+        Raises:
+            JobCancelled: When the job was cancelled in the meantime.
+        """
+        if self._cancel_requested.is_set():
+            raise JobCancelled()
+        self.progress = done / total if total else 0.0
+        self.message = message
+
+    def cancel(self):
+        """
+        Asks the job to stop. A queued job never starts; a running job stops at
+        its next progress report.
+        """
+        self._cancel_requested.set()
+        if self._future is not None and self._future.cancel():
+            self.status = CANCELLED
+
+    def _run(self):
+        if self._cancel_requested.is_set():
+            self.status = CANCELLED
+            return
+        self.status = RUNNING
+        try:
+            self.result = self._function(self, *self._args, **self._kwargs)
+            self.progress = 1.0
+            self.status = DONE
+        except (JobCancelled, CancelledError):
+            self.status = CANCELLED
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.status = FAILED
+        finally:
+            # The arguments (often whole DataFrames) are not needed anymore
+            self._args = self._kwargs = None
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="import-wizard-job")
+        return _executor
+
+
+def get_process_pool():
+    """
+    The process pool shared by all jobs, started on first use.
+
+    Jobs hand it their CPU-bound work instead of starting pools of their
+    own, so however many jobs run, the app never has more than
+    MAX_PROCESSES worker processes; work beyond that waits in its queue.
+    """
+    global _process_pool
+    with _executor_lock:
+        # A pool whose worker died refuses all work; the next job gets a new one
+        if _process_pool is None or getattr(_process_pool, "_broken", False):
+            _process_pool = ProcessPoolExecutor(
+                max_workers=MAX_PROCESSES, mp_context=multiprocessing.get_context(PROCESS_START_METHOD)
+            )
+        return _process_pool
+
+
+def submit(kind, function, *args, **kwargs):
+    """
+    Queues `function(job, *args, **kwargs)` on the shared worker pool.
+
+    Parameters:
+        kind (str): What the job does, e.g. "validation".
+        function (callable): Work to run; gets the Job first.
+
+    Returns:
+        Job: Handle to poll and cancel.
+    """
+    job = Job(kind, function, args, kwargs)
+    job._future = _get_executor().submit(job._run)
+    return job
+
@@ -0,0 +1,229 @@
+import difflib
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import templates
+
+# Directory holding the saved mapping profiles
+PROFILE_DIR = Path(os.environ.get("IMPORT_WIZARD_PROFILE_DIR", Path(__file__).parent / "mapping_profiles"))
+
+# Minimum score for a suggested mapping
+MIN_SCORE = 0.6
+
+# Matches against a template's display labels count slightly less than matches against its headers
+LABEL_WEIGHT = 0.95
+
+# Header words that mean the same thing, mapped to one canonical token
+SYNONYMS = {
+    "mail": "email", "e": "email", "emailaddress": "email",
+    "tel": "phone", "telephone": "phone", "mobile": "phone", "cell": "phone", "phonenumber": "phone",
+    "zip": "zipcode", "postal": "zipcode", "postcode": "zipcode", "postalcode": "zipcode",
+    "province": "state", "region": "state",
+    "nation": "country",
+    "company": "companyname", "organisation": "companyname", "organization": "companyname",
+    "first": "firstname", "given": "firstname", "forename": "firstname",
+    "last": "lastname", "surname": "lastname", "family": "lastname",
+    "vat": "vatregnumber", "trn": "vatregnumber", "tax": "vatregnumber",
+    "curr": "currency", "ccy": "currency",
+    "payment": "terms", "paymentterms": "terms",
+    "addr": "address", "street": "line",
+    "no": "number", "num": "number", "nbr": "number",
+    "inactive": "isinactive", "individual": "isperson",
+}
+
+# Tokens that carry no meaning in a header
+STOP_WORDS = {"the", "of", "name", "code"}
+
+
+def normalize_header(name):
+    """
+    Splits a header into lowercase canonical tokens.
+
+    CamelCase, digits, punctuation and underscores separate tokens, and
+    synonyms are replaced by their canonical token, e.g. "Address1_zipCode"
+    and "address 1 postal code" both become ["address", "1", "zipcode"].
+    """
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", str(name))
+    text = re.sub(r"([A-Za-z])(\d)|(\d)([A-Za-z])", r"\1\3 \2\4", text)
+    tokens = [token for token in re.split(r"[^0-9a-z]+", text.lower()) if token]
+
+    # Join two-word synonyms such as "phone number" or "postal code" first
+    joined = []
+    position = 0
+    while position < len(tokens):
+        pair = "".join(tokens[position:position + 2])
+        if position + 1 < len(tokens) and pair in SYNONYMS:
+            joined.append(SYNONYMS[pair])
+            position += 2
+        else:
+            joined.append(SYNONYMS.get(tokens[position], tokens[position]))
+            position += 1
+    return [token for token in joined if token not in STOP_WORDS] or joined
+
+
+class MappingIndex:
+    """
+    Similarity index over the headers (and display labels) of a template.
+
+    The normalized form of every template column is computed once, so
+    suggesting mappings for hundreds of source columns is one batch of
+    cheap comparisons.
+    """
+
+    def __init__(self, template_columns, labels=None):
+        self.template_columns = list(template_columns)
+        self._entries = []  # (template column, normalized text, token set, weight, matcher)
+        for column in self.template_columns:
+            names = [(column, 1.0)]
+            if labels and labels.get(column):
+                names.append((labels[column], LABEL_WEIGHT))
+            for name, weight in names:
+                tokens = normalize_header(name)
+                text = " ".join(tokens)
+                # SequenceMatcher indexes its second sequence, so each template header is indexed once
+                matcher = difflib.SequenceMatcher(None, autojunk=False)
+                matcher.set_seq2(text)
+                self._entries.append((column, text, set(tokens), weight, matcher))
+
+    def score(self, source_column, min_score=0.0):
+        """
+        Best match score of `source_column` against every template column.
+
+        An exact match of the normalized headers scores 1; otherwise the score
+        is the larger of the token overlap and the character similarity,
+        scaled by 0.9. The character similarity is skipped when it cannot
+        raise the score to `min_score`, so scores below `min_score` may be
+        underestimated.
+
+        Returns:
+            dict: Template column -> score between 0 and 1.
+        """
+        tokens = normalize_header(source_column)
+        text, token_set = " ".join(tokens), set(tokens)
+        scores = {}
+        for column, entry_text, entry_tokens, weight, matcher in self._entries:
+            if text == entry_text:
+                score = 1.0
+            else:
+                score = len(token_set & entry_tokens) / len(token_set | entry_tokens)
+                # The full ratio is only computed when its upper bounds can beat the overlap and min_score
+                matcher.set_seq1(text)
+                floor = max(score, min_score / (0.9 * weight))
+                if matcher.real_quick_ratio() >= floor and matcher.quick_ratio() >= floor:
+                    score = max(score, matcher.ratio())
+                score *= 0.9
+            scores[column] = max(scores.get(column, 0.0), score * weight)
+        return scores
+
+    def suggest(self, source_columns, min_score=MIN_SCORE):
+        """
+        Suggests a one-to-one mapping of source columns to template columns.
+
+        Pairs are assigned greedily from the highest score down, so each
+        template column is used at most once.
+
+        Returns:
+            dict: Source column -> (template column, score) for the mapped columns.
+        """
+        candidates = []
+        for source_column in source_columns:
+            for column, score in self.score(source_column, min_score).items():
+                if score >= min_score:
+                    candidates.append((score, source_column, column))
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        suggestions, used = {}, set()
+        for score, source_column, column in candidates:
+            if source_column not in suggestions and column not in used:
+                suggestions[source_column] = (column, round(score, 3))
+                used.add(column)
+        return suggestions
+
+
+# Process-wide cache shared by all sessions: template path -> (mtime, size, MappingIndex)
+_index_cache = {}
+
+
+def get_index(template_name):
+    """
+    Similarity index of a template, rebuilt only when its workbook changes.
+    """
+    info = templates.get_template(template_name)
+    cached = _index_cache.get(info.path)
+    if cached is not None and cached[:2] == (info.mtime_ns, info.size):
+        return cached[2]
+    index = MappingIndex(info.columns, info.labels)
+    _index_cache[info.path] = (info.mtime_ns, info.size, index)
+    return index
+
+
+def _profile_path(template, profile_name, profile_dir):
+    safe_name = re.sub(r"[^\w\- ]+", "_", f"{template}__{profile_name}").strip()
+    # Names that sanitize alike ("a/b", "a_b") still get their own file
+    digest = hashlib.blake2b(f"{template}\0{profile_name}".encode(), digest_size=4).hexdigest()
+    return Path(profile_dir) / f"{safe_name}-{digest}.json"
+
+
+def _read_profiles(template, profile_dir):
+    profile_dir = Path(profile_dir)
+    if not profile_dir.is_dir():
+        return
+    for path in sorted(profile_dir.glob("*.json")):
+        try:
+            with open(path, encoding="utf-8") as file:
+                profile = json.load(file)
+        except (OSError, ValueError):
+            continue
+        if profile.get("template") == template:
+            yield profile
+
+
+def list_profiles(template, profile_dir=PROFILE_DIR):
+    """
+    Names of the mapping profiles saved for a template.
+    """
+    return [profile["name"] for profile in _read_profiles(template, profile_dir)]
+
+
+def match_profile(template, source_columns, profile_dir=PROFILE_DIR):
+    """
+    Finds the saved profile that fits a file's columns best.
+
+    A profile fits when every source column it maps is in the file; of the
+    fitting profiles, the one mapping the most columns wins.
+
+    Returns:
+        str: Profile name, or None when no profile fits.
+    """
+    source_columns = set(source_columns)
+    best_name, best_size = None, 0
+    for profile in _read_profiles(template, profile_dir):
+        mapped = set(profile["mapping"])
+        if mapped and mapped <= source_columns and len(mapped) > best_size:
+            best_name, best_size = profile["name"], len(mapped)
+    return best_name
+
+
+def load_profile(template, profile_name, profile_dir=PROFILE_DIR):
+    """
+    Source column -> template column mapping of a saved profile.
+    """
+    with open(_profile_path(template, profile_name, profile_dir), encoding="utf-8") as file:
+        return json.load(file)["mapping"]
+
+
+def save_profile(template, profile_name, column_mapping, profile_dir=PROFILE_DIR):
+    """
+    Saves a mapping profile, replacing any profile with the same name.
+    """
+    path = _profile_path(template, profile_name, profile_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profile = {"name": profile_name, "template": template, "mapping": column_mapping}
+    # Write to a temporary file first so a crash never leaves a half-written profile
+    temporary_path = path.with_suffix(".json.tmp")
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump(profile, file, ensure_ascii=False, indent=2)
+    os.replace(temporary_path, path)
@@ -0,0 +1,137 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import phonenumbers
+
+from countries import COUNTRY_MAPPING, lookup_country
+from verdict_cache import VerdictCache
+
+DEFAULT_REGION = "US"
+
+# Maximum number of (number, region) verdicts kept by the parse cache
+PARSE_CACHE_SIZE = 200_000
+
+# Bump when `check_phone_number` changes, so verdicts cached by an older version are dropped
+RULE_VERSION = 1
+
+# Verdicts of `check_phone_number` that survive between uploads, keyed by region and number
+VERDICTS = VerdictCache("phone", f"{RULE_VERSION}/phonenumbers {phonenumbers.__version__}")
+
+# Commonly used emergency service prefixes, accepted without parsing
+EMERGENCY_NUMBERS = ('112', '911', '999', '100', '101', '102')
+
+# Region code of every official country name; other spellings are resolved with lookup_country
+REGION_CODES = {
+    lookup_country(code): code for code in COUNTRY_MAPPING if len(code) == 2 and code.isalpha()
+}
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def check_phone_number(phone, region=DEFAULT_REGION):
+    """
+    Validates a single phone number.
+
+    Numbers starting with '+' are parsed as international numbers, any other
+    number is parsed as a national number of `region`.
+
+    Returns:
+        tuple: (is_valid, E.164 formatted number or None)
+    """
+    # Skip single quote character if it exists as the first character
+    if phone.startswith("'"):
+        phone = phone[1:]
+
+    # Check maximum length
+    if len(phone) > 32:
+        return False, None
+
+    if phone.startswith(EMERGENCY_NUMBERS):
+        return True, None
+
+    try:
+        if phone.startswith('+'):
+            parsed_number = phonenumbers.parse(phone)
+        else:
+            parsed_number = phonenumbers.parse(phone, region)
+    except phonenumbers.NumberParseException:
+        return False, None
+
+    if phonenumbers.is_valid_number(parsed_number) or phonenumbers.is_possible_number(parsed_number):
+        return True, phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.E164)
+    return False, None
+
+
+def regions_from_countries(dataframe, country_columns, default_region=DEFAULT_REGION):
+    """
+    Region code for every row, taken from the first of `country_columns` that
+    holds a recognized country spelling (any name, ISO code or alias known to
+    `lookup_country`), or `default_region` otherwise.
+
+    Each distinct spelling is looked up once and the region is broadcast back
+    to the rows through the factorize codes.
+    """
+    regions = pd.Series(np.nan, index=dataframe.index, dtype=object)
+    for country_column in country_columns:
+        if country_column in dataframe.columns:
+            codes, uniques = pd.factorize(dataframe[country_column])
+            found = [REGION_CODES.get(lookup_country(value), np.nan) for value in uniques]
+            # Code -1 (missing) picks the trailing NaN
+            found = np.array(found + [np.nan], dtype=object)[codes]
+            regions = regions.fillna(pd.Series(found, index=dataframe.index))
+    return regions.fillna(default_region)
+
+
+def check_phones(column, regions=None):
+    """
+    Validates a column of phone numbers, each against the region of its row.
+
+    Every distinct (number, region) pair is checked once, unless the VERDICTS
+    cache already holds it from an earlier upload, and the verdicts are
+    broadcast back to the rows. Missing values are neither valid nor invalid.
+    Large files are parsed in parallel by sharding their rows, see
+    `validations.run_sharded`.
+
+    Parameters:
+        column (pd.Series): Phone numbers.
+        regions (pd.Series): Region code per row (see `regions_from_countries`);
+            DEFAULT_REGION for every row when omitted.
+
+    Returns:
+        tuple: (boolean np.ndarray marking invalid rows,
+                pd.Series of E.164 numbers, NaN where invalid, missing or not formattable)
+    """
+    if regions is None:
+        regions = pd.Series(DEFAULT_REGION, index=column.index)
+    else:
+        regions = regions.fillna(DEFAULT_REGION)
+
+    present = column.notna().to_numpy()
+    # Factorize numbers and regions separately and combine the integer codes,
+    # which is much cheaper than hashing (number, region) tuples
+    phone_codes, phone_uniques = pd.factorize(column[present])
+    region_codes, region_uniques = pd.factorize(regions[present])
+    codes, pair_codes = pd.factorize(phone_codes.astype(np.int64) * len(region_uniques) + region_codes)
+    phones = np.asarray(phone_uniques, dtype=object)[pair_codes // max(len(region_uniques), 1)].tolist()
+    pair_regions = np.asarray(region_uniques, dtype=object)[pair_codes % max(len(region_uniques), 1)].tolist()
+
+    keys = [f"{region}\x00{phone}" for phone, region in zip(phones, pair_regions)]
+    results = VERDICTS.get(keys)
+    # Only the pairs not cached by an earlier upload are parsed
+    missing = [position for position, result in enumerate(results) if result is None]
+    phones = [phones[position] for position in missing]
+    pair_regions = [pair_regions[position] for position in missing]
+
+    checked = [check_phone_number(phone, region) for phone, region in zip(phones, pair_regions)]
+    for position, result in zip(missing, checked):
+        results[position] = result
+    VERDICTS.put([keys[position] for position in missing], checked)
+
+    valid_uniques = np.array([valid for valid, _ in results], dtype=bool)
+    e164_uniques = np.array([e164 for _, e164 in results], dtype=object)
+
+    invalid_mask = np.zeros(len(column), dtype=bool)
+    invalid_mask[present] = ~valid_uniques[codes]
+    e164 = np.full(len(column), None, dtype=object)
+    e164[present] = e164_uniques[codes]
+    return invalid_mask, pd.Series(e164, index=column.index, name=column.name)
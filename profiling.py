@@ -0,0 +1,238 @@
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+_NULL_CONTEXT = nullcontext()
+
+# Traced stages open in any thread of any profiler: id -> [memory at start, highest peak seen].
+# tracemalloc's peak is process-wide, so each reset first hands the peak to every open stage.
+_open_stages = {}
+# Profilers whose stop waits for the open stages to close
+_stop_requests = set()
+_trace_lock = threading.Lock()
+
+RECORD_COLUMNS = ["stage", "rows", "columns", "wall_seconds", "cpu_seconds", "peak_memory_mib"]
+
+
+class Profiler:
+    """
+    Records wall time, CPU time and data size of named stages.
+
+    CPU time is that of the thread running the stage (`time.thread_time`),
+    so stages of concurrent jobs do not count each other's work; work a
+    stage hands to other threads (Arrow's reader threads) or processes is
+    not included, and worker processes report theirs through `add`.
+    With `trace_memory`, tracemalloc also measures the peak memory each stage
+    allocated above what was allocated when it started. Tracing slows
+    Python-heavy code down noticeably, so it is off by default. Stages can be
+    nested and opened from several threads at once (e.g. background jobs);
+    every stage gets its own record. tracemalloc counts the memory of the
+    whole process, so the peak of a stage includes what other threads
+    allocated while it ran.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._started = False
+
+    @contextmanager
+    def stage(self, name, rows=None, columns=None):
+        """
+        Times the block under `name`.
+
+        Parameters:
+            name (str): Stage name, e.g. "read" or "rule.email.email".
+            rows (int): Rows processed by the stage.
+            columns (int): Columns processed by the stage.
+        """
+        entry = None
+        if self.trace_memory:
+            with _trace_lock:
+                if tracemalloc.is_tracing():
+                    current, peak = tracemalloc.get_traced_memory()
+                    # Open stages keep the peak reached before this stage resets it
+                    for other in _open_stages.values():
+                        other[1] = max(other[1], peak)
+                    tracemalloc.reset_peak()
+                    entry = [current, current]
+                    _open_stages[id(entry)] = entry
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            peak_mib = None
+            if entry is not None:
+                with _trace_lock:
+                    del _open_stages[id(entry)]
+                    if tracemalloc.is_tracing():
+                        highest = max(entry[1], tracemalloc.get_traced_memory()[1])
+                        peak_mib = (highest - entry[0]) / 1024 ** 2
+                    if not _open_stages:
+                        for profiler in _stop_requests:
+                            profiler._stop_tracing()
+                        _stop_requests.clear()
+            self.add(name, rows, columns, wall, cpu, peak_mib)
+
+    def add(self, name, rows, columns, wall_seconds, cpu_seconds, peak_memory_mib=None):
+        """
+        Adds a stage measured elsewhere, e.g. in a worker process.
+        """
+        self.records.append({
+            "stage": name, "rows": rows, "columns": columns, "wall_seconds": wall_seconds,
+            "cpu_seconds": cpu_seconds, "peak_memory_mib": peak_memory_mib,
+        })
+
+    def iterate(self, name, iterable):
+        """
+        Yields the items of `iterable`, recording the time spent producing
+        each one (e.g. reading a chunk) under `name`, with the item's length
+        as the row count. Memory is not traced for these stages.
+        """
+        iterator = iter(iterable)
+        while True:
+            wall, cpu = time.perf_counter(), time.thread_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            columns = len(item.columns) if hasattr(item, "columns") else None
+            self.add(name, len(item), columns, time.perf_counter() - wall, time.thread_time() - cpu)
+            yield item
+
+    def start(self):
+        """
+        Starts tracemalloc when memory tracing was asked for.
+        """
+        with _trace_lock:
+            _stop_requests.discard(self)
+            if self.trace_memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started = True
+
+    def stop(self):
+        """
+        Stops tracemalloc if this profiler started it, once no traced stage
+        is open in any thread.
+        """
+        with _trace_lock:
+            if not self._started:
+                return
+            if _open_stages:
+                _stop_requests.add(self)
+            else:
+                self._stop_tracing()
+
+    def _stop_tracing(self):
+        # Called with _trace_lock held
+        tracemalloc.stop()
+        self._started = False
+
+    def to_frame(self):
+        return pd.DataFrame(self.records, columns=RECORD_COLUMNS)
+
+    def summary(self):
+        """
+        Records of the same stage added up: calls, rows, wall and CPU time,
+        and the largest memory peak. Slowest stages first.
+        """
+        return summarize(self.records)
+
+
+class NullProfiler:
+    """
+    Stand-in used when profiling is off: stages cost one method call.
+    """
+    trace_memory = False
+    records = ()
+
+    def stage(self, name, rows=None, columns=None):
+        return _NULL_CONTEXT
+
+    def add(self, name, rows, columns, wall_seconds, cpu_seconds, peak_memory_mib=None):
+        pass
+
+    def iterate(self, name, iterable):
+        return iterable
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def summarize(records, by=("stage",)):
+    """
+    Adds up records per stage (and any extra label columns in `by`).
+    """
+    frame = pd.DataFrame(list(records))
+    if frame.empty:
+        return pd.DataFrame(columns=[*by, "calls", "rows", "wall_seconds", "cpu_seconds", "peak_memory_mib"])
+    grouped = frame.groupby(list(by), sort=False, dropna=False)
+    summary = grouped.agg(
+        calls=("wall_seconds", "size"),
+        rows=("rows", "sum"),
+        wall_seconds=("wall_seconds", "sum"),
+        cpu_seconds=("cpu_seconds", "sum"),
+        peak_memory_mib=("peak_memory_mib", "max"),
+    ).reset_index()
+    return summary.sort_values("wall_seconds", ascending=False, ignore_index=True)
+
+
+def to_json(records, labels=None):
+    """
+    JSON document with the raw records and their per-stage summary.
+    """
+    records = list(records)
+    by = ("stage", *(labels or ()))
+    summary = summarize(records, by).astype(object)
+    document = {
+        "records": records,
+        "summary": summary.where(summary.notna(), None).to_dict("records"),
+    }
+    return json.dumps(document, ensure_ascii=False, indent=2, default=str)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def to_prometheus(records, labels=None, prefix="import_wizard"):
+    """
+    Prometheus text exposition of the per-stage summary.
+
+    Parameters:
+        records (iterable): Profiler records.
+        labels (tuple): Extra record keys exported as labels, e.g. ("file",).
+        prefix (str): Metric name prefix.
+    """
+    by = ("stage", *(labels or ()))
+    summary = summarize(records, by)
+    metrics = [
+        ("stage_calls_total", "counter", "Number of times the stage ran.", "calls"),
+        ("stage_rows_total", "counter", "Rows processed by the stage.", "rows"),
+        ("stage_wall_seconds_total", "counter", "Wall time spent in the stage.", "wall_seconds"),
+        ("stage_cpu_seconds_total", "counter", "CPU time of the thread running the stage.", "cpu_seconds"),
+        ("stage_peak_memory_mebibytes", "gauge", "Largest memory peak of the stage above its start.",
+         "peak_memory_mib"),
+    ]
+    lines = []
+    for name, kind, help_text, column in metrics:
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for row in summary.itertuples(index=False):
+            value = getattr(row, column)
+            if pd.isna(value):
+                continue
+            label_text = ",".join(f'{label}="{_escape_label(getattr(row, label))}"' for label in by)
+            lines.append(f"{prefix}_{name}{{{label_text}}} {float(value):g}")
+    return "\n".join(lines) + "\n"
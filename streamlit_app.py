@@ -1,39 +1,275 @@
 import streamlit as st
 import pandas as pd
 import openpyxl
-from validations import validate_customer_template  # Import validation functions
+import io
+import os
+from functools import partial
+from validations import PLANS, VALIDATIONS, IncrementalValidator, run_sharded, validate_in_chunks  # Import validation functions
+import column_stats
 import countries
+import emails
+import error_view
+import exports
+import id_index
+import ingest
+import jobs
+import mapping
+import profiling
+import templates
+import upload_cache
 import weird_characters
 
-# Upload Templates
-TEMPLATES = {
-    "Assembly Template": "Assembly Template.xlsx",
-    "Bill of Material Template": "Bill of material template.xlsx",
-    "Customer Template": "Customer Template.xlsx",
-    # Add all templates you have in the dictionary
-}
-
-VALIDATIONS = {
-    "Customer Template": validate_customer_template,
-    # Add all templates you have in the dictionary
-}
-
-# Sidebar Navigation
+# Upload Templates (add a template by dropping its workbook into templates.TEMPLATE_DIR)
+TEMPLATES = templates.discover_templates()
+
+JOB_SLOTS = ["validation_job", "countries_job", "cleaning_job"]
+
+def jobs_running():
+    return any(not st.session_state[slot][1].finished for slot in JOB_SLOTS if slot in st.session_state)
+
+def get_profiler():
+    # Stage timings are only recorded while enabled in the sidebar; otherwise stages are no-ops.
+    # Memory tracing stays on while a job of the session may still be inside a stage.
+    if not st.session_state.get("profiling_enabled"):
+        if "profiler" in st.session_state and not jobs_running():
+            st.session_state["profiler"].stop()
+        return profiling.NULL_PROFILER
+    if "profiler" not in st.session_state:
+        st.session_state["profiler"] = profiling.Profiler()
+    profiler = st.session_state["profiler"]
+    profiler.trace_memory = st.session_state.get("profiling_trace_memory", False)
+    if profiler.trace_memory:
+        profiler.start()
+    elif not jobs_running():
+        profiler.stop()
+    return profiler
+
+def load_upload(uploaded_file, nrows=None):
+    # Parsed uploads are cached for the session so reruns never re-parse the file
+    if "upload_cache" not in st.session_state:
+        st.session_state["upload_cache"] = upload_cache.UploadCache()
+    engine = READER_ENGINES[ingest.get_file_extension(uploaded_file.name)]
+    with PROFILER.stage("read_upload"):
+        data = st.session_state["upload_cache"].read(uploaded_file, nrows, engine)
+    return data
+
+def select_export_format(key):
+    return st.radio("Export format", list(exports.EXPORT_FORMATS), horizontal=True, key=f"{key}_export_format")
+
+def export_frame(profiler, frame, file_format, issues=None):
+    with profiler.stage(f"export_{file_format}", len(frame), len(frame.columns)):
+        if issues is not None:
+            return exports.export_annotated(frame, issues, file_format)
+        return exports.export_frame(frame, file_format)
+
+def download_button(label, frame, file_stem, file_format, key, issues=None):
+    # The file is built in memory only when the button is clicked, and clicking does not rerun the page
+    st.download_button(
+        label=label,
+        data=partial(export_frame, PROFILER, frame, file_format, issues),
+        file_name=exports.export_file_name(file_stem, file_format),
+        mime=exports.EXPORT_FORMATS[file_format],
+        key=key,
+        on_click="ignore",
+    )
+
+def submit_job(slot, key, kind, function, *args):
+    # One job per page slot; a new submission cancels the previous one
+    previous = st.session_state.get(slot)
+    if previous is not None:
+        previous[1].cancel()
+    st.session_state[slot] = (key, jobs.submit(kind, function, *args))
+
+def show_job(slot, key):
+    """
+    Shows the progress of the slot's background job while it runs, polling
+    it every second without rerunning the page.
+
+    Returns:
+        The job's result once it finished successfully for `key`, else None.
+    """
+    entry = st.session_state.get(slot)
+    if entry is None or entry[0] != key:
+        return None
+    job = entry[1]
+    if not job.finished:
+        @st.fragment(run_every=1)
+        def poll():
+            if job.finished:
+                st.rerun()
+            status = job.message or ("Waiting for a free worker..." if job.status == jobs.QUEUED else "")
+            st.progress(job.progress, text=status)
+            if st.button("Cancel", key=f"cancel_{job.id}"):
+                job.cancel()
+        poll()
+    elif job.status == jobs.FAILED:
+        st.error(f"Error during processing: {job.error}")
+    elif job.status == jobs.CANCELLED:
+        st.warning("Cancelled.")
+    return job.result if job.status == jobs.DONE else None
+
+def _rule_profiler(profiler):
+    # The validation functions skip profiling entirely when given no profiler
+    return None if profiler is profiling.NULL_PROFILER else profiler
+
+def validation_job(job, data, template, column_mapping, index, workers, validator, profiler):
+    # Runs on the job pool; reports progress rule by rule
+    data = data.rename(columns=column_mapping)
+    note = None
+    if workers > 1:
+        validation_errors = run_sharded(
+            template, data, workers=workers, profiler=_rule_profiler(profiler), progress=job.report,
+            executor=jobs.get_process_pool(),
+        )
+    else:
+        # Only rules whose input columns changed since the last run are re-run
+        validation_errors = validator.run(PLANS[template], data, _rule_profiler(profiler), job.report)
+        note = (
+            f"Ran {validator.last_run} of {validator.last_run + validator.last_reused} rules, "
+            "reused earlier results for the rest."
+        )
+    if index is not None:
+        job.report(1, 1, "Checking IDs against earlier exports")
+        with profiler.stage("id_index", len(data)):
+            validation_errors.add(index.find_imported(data))
+    return validation_errors, note
+
+def chunked_validation_job(job, content, file_extension, engine, template, column_mapping, index, workers, profiler):
+    # Runs on the job pool; reports progress by the share of the file read so far
+    validation_function = VALIDATIONS[template]
+    if workers > 1:
+        validation_function = partial(run_sharded, template, workers=workers, executor=jobs.get_process_pool())
+    if index is not None:
+        validation_function = id_index.with_imported_check(validation_function, index)
+    stream = io.BytesIO(content)
+
+    def reported(chunks):
+        rows = 0
+        for chunk in chunks:
+            yield chunk
+            rows += len(chunk)
+            job.report(stream.tell(), len(content), f"Validated {rows:,} rows")
+
+    chunks = profiler.iterate("read_chunk", ingest.iter_chunks(stream, file_extension, engine=engine))
+    return validate_in_chunks(reported(chunks), validation_function, column_mapping, _rule_profiler(profiler)), None
+
+def countries_job(job, data, country_column, profiler):
+    job.report(0, 1, f"Renaming countries in {country_column}")
+    with profiler.stage("normalize_countries", len(data), 1):
+        normalized, unmapped = countries.normalize_countries(data[country_column])
+    return data.assign(**{country_column: normalized}), unmapped
+
+def cleaning_job(job, df, selected_columns, language, profiler):
+    with profiler.stage("clean_columns", len(df), len(selected_columns)):
+        return weird_characters.clean_columns(df, selected_columns, language, progress=job.report)
+
+def select_column_mapping(source_columns, template_name, template_columns):
+    """
+    Shows one editable table mapping every source column to a template field.
+
+    The table starts from the saved profile that fits the file, if any, and
+    otherwise from the suggestions of the template's similarity index.
+
+    Returns:
+        dict: Source column -> template column for the mapped columns.
+    """
+    source_columns = list(source_columns)
+    profiles = mapping.list_profiles(template_name)
+    matched = mapping.match_profile(template_name, source_columns)
+    options = ["--Suggested--"] + profiles
+    profile_name = st.selectbox(
+        "Mapping profile", options, index=options.index(matched) if matched else 0, key="mapping_profile"
+    )
+
+    if profile_name == "--Suggested--":
+        # Suggestions are kept for the session so reruns do not score the headers again
+        suggestion_key = (template_name, tuple(source_columns))
+        if st.session_state.get("mapping_suggestions", (None,))[0] != suggestion_key:
+            suggestions = mapping.get_index(template_name).suggest(source_columns) if template_columns else {}
+            st.session_state["mapping_suggestions"] = (suggestion_key, suggestions)
+        suggestions = st.session_state["mapping_suggestions"][1]
+    else:
+        saved = mapping.load_profile(template_name, profile_name)
+        suggestions = {column: (saved[column], None) for column in source_columns if saved.get(column) in template_columns}
+
+    editor = pd.DataFrame({
+        "Source column": source_columns,
+        "Template field": [suggestions.get(column, (None,))[0] for column in source_columns],
+        "Match score": [suggestions.get(column, (None, None))[1] for column in source_columns],
+    })
+    edited = st.data_editor(
+        editor,
+        column_config={
+            "Template field": st.column_config.SelectboxColumn(options=template_columns),
+            "Match score": st.column_config.NumberColumn(format="%.2f"),
+        },
+        disabled=["Source column", "Match score"],
+        hide_index=True,
+        # A new table for every file, template and profile, so edits never carry over to other columns
+        key=f"mapping_editor_{template_name}_{profile_name}_{hash(tuple(source_columns))}",
+    )
+    column_mapping = {
+        source: field
+        for source, field in zip(edited["Source column"], edited["Template field"])
+        if isinstance(field, str) and field in template_columns
+    }
+
+    duplicates = sorted({field for field in column_mapping.values() if list(column_mapping.values()).count(field) > 1})
+    if duplicates:
+        st.warning(f"Several columns are mapped to: {', '.join(duplicates)}")
+
+    # Saved profiles are picked automatically the next time a file from the same source is uploaded
+    with st.expander("Save mapping profile"):
+        source_system = st.text_input("Source system name", value="" if profile_name == "--Suggested--" else profile_name)
+        if st.button("Save profile", disabled=not source_system.strip() or not column_mapping):
+            mapping.save_profile(template_name, source_system.strip(), column_mapping)
+            st.success(f"Saved the {source_system.strip()} mapping profile.")
+    return column_mapping
+
+# Sidebar Navigation (the Performance page is listed while stage timings are recorded)
 menu = ["Interactive Import Wizard", "Rename Country Names", "Clean Weird Characters"]
+if st.session_state.get("profiling_enabled"):
+    menu.append("Performance")
 choice = st.sidebar.selectbox("Select Page", menu)
 
+# File readers (the fastest available one is selected by default)
+with st.sidebar.expander("File readers"):
+    READER_ENGINES = {
+        "csv": st.selectbox("CSV reader", ingest.available_engines("csv")),
+        "xlsx": st.selectbox("Excel reader", ingest.available_engines("xlsx")),
+    }
+
+# Worker processes for validating large files in row shards (1 = validate in this process)
+with st.sidebar.expander("Validation"):
+    VALIDATION_WORKERS = st.number_input(
+        "Worker processes", min_value=1, max_value=os.cpu_count() or 1, value=1,
+        help="Row-independent rules of large files are validated in parallel shards.",
+    )
+
+with st.sidebar.expander("Performance"):
+    st.checkbox("Record stage timings", key="profiling_enabled",
+                help="Times every step and validation rule; see the Performance page.")
+    st.checkbox("Trace memory", key="profiling_trace_memory", disabled=not st.session_state.get("profiling_enabled"),
+                help="Also records each stage's peak memory; slows processing down.")
+PROFILER = get_profiler()
+
 if choice == "Interactive Import Wizard":
     st.title("Interactive Import Wizard")
 
     # Step 1: File Upload
     uploaded_file = st.file_uploader("Upload an Excel/CSV File", type=["csv", "xlsx"])
+    large_file_mode = st.checkbox(
+        "Large file mode (validate in chunks of "
+        f"{ingest.DEFAULT_CHUNK_SIZE:,} rows without loading the whole file)"
+    )
 
     if uploaded_file:
-        file_extension = uploaded_file.name.split('.')[-1].lower()
-        if file_extension == "csv":
-            data = pd.read_csv(uploaded_file, dtype=str)
-        elif file_extension == "xlsx":
-            data = pd.read_excel(uploaded_file, dtype=str)
+        file_extension = ingest.get_file_extension(uploaded_file.name)
+        if large_file_mode:
+            # Only the first rows are loaded; validation streams the full file
+            data = load_upload(uploaded_file, nrows=ingest.DEFAULT_CHUNK_SIZE)
+        else:
+            data = load_upload(uploaded_file)
         
         st.write("Preview of Uploaded File:")
         st.dataframe(data.head())
@@ -41,79 +277,117 @@ if choice == "Interactive Import Wizard":
         # Step 2: Template Selection
         selected_template = st.selectbox("Select the Template", list(TEMPLATES.keys()))
         if selected_template:
-            template_file = TEMPLATES[selected_template]
             st.write(f"You selected the {selected_template} template.")
             
             # Load template column headers
             try:
-                template_data = pd.read_excel(template_file, dtype=str)
-                template_columns = template_data.columns.tolist()
+                template_columns = templates.get_template(selected_template).columns
             except Exception as e:
                 st.error(f"Error loading the template file: {e}")
                 template_columns = []
 
             # Step 3: Mapping Columns
             st.subheader("Column Mapping")
-            column_mapping = {}
-
-            for col in data.columns:
-                # Check if the column name matches any of the template columns
-                default_selection = col if col in template_columns else "--Select--"
-                
-                # Get the index of the default selection in the options list
-                options = ["--Select--"] + template_columns
-                default_index = options.index(default_selection)
-                
-                # Create a selectbox with the default selection
-                mapped_field = st.selectbox(
-                    f"Map your data column `{col}` to a template field:",
-                    options=options,
-                    index=default_index,
-                    key=col
-                )
-                
-                # Add mapping if a valid field is selected
-                if mapped_field != "--Select--":
-                    column_mapping[col] = mapped_field
+            with PROFILER.stage("column_mapping", len(data), len(data.columns)):
+                column_mapping = select_column_mapping(data.columns, selected_template, template_columns)
 
             # Step 4: Data Exploration
             st.subheader("Data Exploration")
             # Show the column-wise data insights
+            if large_file_mode:
+                st.caption(f"Column information covers the first {len(data):,} rows only.")
             if st.checkbox("Show Column Information"):
-                # Display data types and number of missing values
-                col_info = pd.DataFrame({
-                    'Null Values': data.isnull().sum(),
-                    'Non-Null Values': data.notnull().sum(),
-                    'Unique Values': data.nunique()
-                })
-                st.write(col_info)
+                # Computed once per upload and cached with it
+                with PROFILER.stage("column_information", len(data), len(data.columns)):
+                    col_info = st.session_state["upload_cache"].column_stats(
+                        uploaded_file, nrows=ingest.DEFAULT_CHUNK_SIZE if large_file_mode else None,
+                        engine=READER_ENGINES[file_extension],
+                    )
+                if col_info["distinct_approximate"].any():
+                    st.caption(
+                        "Distinct counts and top values of columns over "
+                        f"{column_stats.APPROXIMATE_ROWS:,} rows are estimates (top value counts marked ~)."
+                    )
+                st.dataframe(col_info)
 
             # Step 5: Validation
             st.subheader("Validation Results")
-            if st.button("Validate File"):
-                # Automatically rename columns in the DataFrame
-                data.rename(columns=column_mapping, inplace=True)
-                validation_function = VALIDATIONS[selected_template]
-                validation_errors = validation_function(data)
+            # Results are only shown, and used for the annotated export, under the mapping they were computed with
+            validation_key = (
+                uploaded_file.name, uploaded_file.size, selected_template, tuple(sorted(column_mapping.items()))
+            )
+            check_earlier_exports = selected_template in VALIDATIONS and st.checkbox(
+                "Check IDs against earlier exports", value=True,
+                help="Reports IDs recorded as imported in an earlier batch of this template.",
+            )
+            if selected_template not in VALIDATIONS:
+                st.warning(f"No validation rules are defined for the {selected_template} yet.")
+            elif st.button("Validate File"):
+                # Validation runs as a background job; the page keeps responding meanwhile
+                index = id_index.IdIndex(selected_template) if check_earlier_exports else None
+                if large_file_mode:
+                    submit_job(
+                        "validation_job", validation_key, "validation", chunked_validation_job,
+                        uploaded_file.getvalue(), file_extension, READER_ENGINES.get(file_extension),
+                        selected_template, column_mapping, index, VALIDATION_WORKERS, PROFILER,
+                    )
+                else:
+                    if "incremental_validator" not in st.session_state:
+                        st.session_state["incremental_validator"] = IncrementalValidator()
+                    submit_job(
+                        "validation_job", validation_key, "validation", validation_job,
+                        data, selected_template, column_mapping, index, VALIDATION_WORKERS,
+                        st.session_state["incremental_validator"], PROFILER,
+                    )
 
+            # Kept in the session so paging through the errors does not re-validate
+            validation_results = show_job("validation_job", validation_key)
+            if validation_results is not None:
+                validation_errors, note = validation_results
+                if note:
+                    st.caption(note)
                 if validation_errors:
                     st.error("Validation errors found!")
+                    with PROFILER.stage("render_errors", len(validation_errors)):
+                        error_view.render_issues(validation_errors, key="validation")
                 else:
                     st.success("All validations passed!")
 
             # Step 6: Export Validated File
             st.subheader("Export Results")
-            if st.button("Export Validated File"):
-                output_file = f"Validated_{selected_template}.xlsx"
-                data.to_excel(output_file, index=False)
-
-                with open(output_file, "rb") as file:
-                    st.download_button(
-                        label="Download Validated File",
-                        data=file,
-                        file_name=output_file,
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+            if large_file_mode:
+                st.info("Export is not available in large file mode.")
+            else:
+                email_column = next((col for col in data.columns if column_mapping.get(col, col) == "email"), None)
+                add_normalized_email = email_column is not None and st.checkbox(
+                    "Add a normalized email column (email_normalized)"
+                )
+                annotate_errors = validation_results is not None and st.checkbox(
+                    "Include the validation errors",
+                    help="Adds error_count and errors columns; Excel files also get the failing cells "
+                         "highlighted and an Errors sheet linking to them.",
+                )
+                export_format = select_export_format(key="validated")
+                export_data = data.rename(columns=column_mapping)
+                if add_normalized_email:
+                    export_data["email_normalized"] = emails.normalize_emails(data[email_column])
+                download_button(
+                    "Download Validated File", export_data, f"Validated_{selected_template}", export_format,
+                    key="download_validated", issues=validation_results[0] if annotate_errors else None,
+                )
+
+                # The IDs are only remembered once the user confirms the file was imported
+                with st.expander("Confirm import"):
+                    index = id_index.IdIndex(selected_template)
+                    batch_name = st.text_input("Batch name", value=uploaded_file.name)
+                    if st.button("Record IDs as imported", disabled=not batch_name.strip()):
+                        with PROFILER.stage("id_index", len(export_data)):
+                            added = index.record_export(batch_name.strip(), export_data)
+                        st.success(f"Recorded {added:,} new IDs from {batch_name.strip()}.")
+                    batches = index.batches()
+                    if not batches.empty:
+                        st.write("Earlier batches:")
+                        st.dataframe(batches, hide_index=True)
 
 
 elif choice == "Rename Country Names":
@@ -123,11 +397,7 @@ elif choice == "Rename Country Names":
     uploaded_file = st.file_uploader("Upload an Excel/CSV File", type=["csv", "xlsx"])
 
     if uploaded_file:
-        file_extension = uploaded_file.name.split('.')[-1].lower()
-        if file_extension == "csv":
-            data = pd.read_csv(uploaded_file, dtype=str)
-        elif file_extension == "xlsx":
-            data = pd.read_excel(uploaded_file, dtype=str)
+        data = load_upload(uploaded_file)
 
         st.write("Preview of Uploaded File:")
         st.dataframe(data.head())
@@ -135,26 +405,28 @@ elif choice == "Rename Country Names":
         # Step 2: Select Country Column
         country_column = st.selectbox("Select the column containing country names:", data.columns)
 
+        export_format = select_export_format(key="countries")
+
         # Step 3: Rename Countries
+        countries_key = (uploaded_file.name, uploaded_file.size, country_column)
         if st.button("Rename Countries"):
-            try:
-                updated_data = countries.rename_countries(data, country_column)
-                st.success("Country names updated successfully!")
-                st.dataframe(updated_data.head())
-
-                # Step 4: Export Updated File
-                output_file = "Updated_Country_Names.xlsx"
-                updated_data.to_excel(output_file, index=False)
-                with open(output_file, "rb") as file:
-                    st.download_button(
-                        label="Download Updated File",
-                        data=file,
-                        file_name=output_file,
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
-            except Exception as e:
-                st.error(f"Error during processing: {e}")
-                
+            submit_job("countries_job", countries_key, "countries", countries_job, data, country_column, PROFILER)
+
+        countries_results = show_job("countries_job", countries_key)
+        if countries_results is not None:
+            updated_data, unmapped = countries_results
+            st.success("Country names updated successfully!")
+            st.dataframe(updated_data.head())
+
+            if not unmapped.empty:
+                st.warning(f"{len(unmapped)} values were not recognized as countries and were left unchanged:")
+                st.dataframe(unmapped.assign(suggestions=unmapped["suggestions"].str.join(", ")), hide_index=True)
+
+            # Step 4: Export Updated File
+            download_button(
+                "Download Updated File", updated_data, "Updated_Country_Names", export_format,
+                key="download_countries"
+            )
 
 
 elif choice == "Clean Weird Characters":
@@ -165,11 +437,7 @@ elif choice == "Clean Weird Characters":
     
     if uploaded_file:
         # Load the file into a DataFrame
-        file_extension = uploaded_file.name.split('.')[-1].lower()
-        if file_extension == "csv":
-            df = pd.read_csv(uploaded_file, dtype=str)
-        elif file_extension == "xlsx":
-            df = pd.read_excel(uploaded_file, dtype=str)
+        df = load_upload(uploaded_file)
 
         st.write("Preview of Uploaded File:")
         st.dataframe(df.head())
@@ -180,45 +448,76 @@ elif choice == "Clean Weird Characters":
 
         # Language selection
         st.subheader("Select Language")
-        language = st.radio("Choose the language:", ["English", "Arabic"])
+        language = st.radio("Choose the language:", list(weird_characters.LANGUAGE_PROFILES))
+
+        export_format = select_export_format(key="cleaned")
 
         # Process and clean the data
+        cleaning_key = (uploaded_file.name, uploaded_file.size, tuple(selected_columns), language)
         if st.button("Clean Data"):
             if not selected_columns:
                 st.error("Please select at least one column to clean.")
             else:
-                # Use the clean_columns function from the module
-                cleaned_df, weird_characters_df = weird_characters.clean_columns(df, selected_columns, language)
-
-                st.success("Data cleaning completed!")
-                st.write("Preview of Cleaned Data:")
-                st.dataframe(cleaned_df.head())
-
-                # Download files
-                st.subheader("Download Results")
-
-                # 1) Rows with weird characters
-                if not weird_characters_df.empty:
-                    st.write("Download rows with weird characters:")
-                    weird_file = "rows_with_weird_characters.xlsx"
-                    weird_characters_df.to_excel(weird_file, index=False)
-                    with open(weird_file, "rb") as file:
-                        st.download_button(
-                            label="Download Rows with Weird Characters",
-                            data=file,
-                            file_name=weird_file,
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                        )
-                else:
-                    st.info("No weird characters found in the selected columns.")
-
-                # 2) Cleaned file
-                cleaned_file = "cleaned_data.xlsx"
-                cleaned_df.to_excel(cleaned_file, index=False)
-                with open(cleaned_file, "rb") as file:
-                    st.download_button(
-                        label="Download Cleaned File",
-                        data=file,
-                        file_name=cleaned_file,
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
\ No newline at end of file
+                submit_job("cleaning_job", cleaning_key, "cleaning", cleaning_job, df, selected_columns, language, PROFILER)
+
+        cleaning_results = show_job("cleaning_job", cleaning_key)
+        if cleaning_results is not None:
+            cleaned_df, weird_characters_df = cleaning_results
+
+            st.success("Data cleaning completed!")
+            st.write("Preview of Cleaned Data:")
+            st.dataframe(cleaned_df.head())
+
+            # Download files
+            st.subheader("Download Results")
+
+            # 1) Cells with weird characters
+            if not weird_characters_df.empty:
+                st.write(
+                    f"Weird characters were removed from {len(weird_characters_df):,} cells "
+                    f"in {weird_characters_df['row'].nunique():,} rows:"
+                )
+                st.dataframe(weird_characters.character_histogram(weird_characters_df), hide_index=True)
+                download_button(
+                    "Download Changed Cells", weird_characters_df,
+                    "cells_with_weird_characters", export_format, key="download_weird_rows"
+                )
+            else:
+                st.info("No weird characters found in the selected columns.")
+
+            # 2) Cleaned file
+            download_button(
+                "Download Cleaned File", cleaned_df, "cleaned_data", export_format, key="download_cleaned"
+            )
+
+
+elif choice == "Performance":
+    st.title("Performance")
+    st.write(
+        "Wall time, CPU time and peak memory of every step and validation rule run in this session "
+        "since recording was turned on."
+    )
+
+    if not PROFILER.records:
+        st.info("Nothing recorded yet. Use the other pages, then come back here.")
+    else:
+        summary = PROFILER.summary()
+        st.subheader("Per stage")
+        st.dataframe(summary, hide_index=True)
+        st.bar_chart(summary.head(20), x="stage", y="wall_seconds", horizontal=True)
+
+        with st.expander("All recorded stages"):
+            st.dataframe(PROFILER.to_frame(), hide_index=True)
+
+        download_columns = st.columns(3)
+        download_columns[0].download_button(
+            "Download JSON", profiling.to_json(PROFILER.records), file_name="metrics.json",
+            mime="application/json", on_click="ignore",
+        )
+        download_columns[1].download_button(
+            "Download Prometheus", profiling.to_prometheus(PROFILER.records), file_name="metrics.prom",
+            mime="text/plain", on_click="ignore",
+        )
+        if download_columns[2].button("Clear"):
+            PROFILER.records.clear()
+            st.rerun()
@@ -0,0 +1,89 @@
+"""
+Declarative validation rules for each import template.
+
+Every template maps a rule kind to the columns it applies to. The rules are
+compiled into a validation plan by `validations.compile_plan`, so supporting
+another template only takes a new entry in TEMPLATE_RULES. Columns missing
+from the uploaded file are skipped.
+
+Rule kinds:
+    unique: Columns whose values must not repeat.
+    max_length: Column -> maximum number of characters.
+    email: Columns holding email addresses.
+    phone: Column -> country columns used as the region of each number.
+    boolean: Columns that must hold TRUE/FALSE (case-insensitive).
+    required_if: Columns that must be filled when another column has a given value.
+    required: Columns that must not be missing or blank.
+    format: Column -> {"pattern": regex, "message": error message}.
+    allowed_values: Column -> name of a vocabulary in `vocabularies.VOCABULARIES`.
+    hierarchy: Column -> name of a reference tree in `hierarchies.REFERENCE_DIR`;
+        skipped when the tree has no file there.
+"""
+
+# Parent : Child subsidiary paths, several paths separated by "|"
+SUBSIDIARY_HIERARCHY_PATTERN = r'^([^\|:]+(:[^\|:]+)*)(\|([^\|:]+(:[^\|:]+)*))*$'
+
+CUSTOMER_TEMPLATE_RULES = {
+    "unique": ["externalId", "entityId"],
+    "max_length": {
+        "externalId": 100,
+        "entityId": 80,
+        "companyName": 83,
+        "firstName": 32,
+        "lastName": 32,
+        "email": 300,
+        "phone": 21,
+        "Address1_AddressName": 150,
+        "Address2_AddressName": 150,
+        "Address2_attention": 83,
+        "Address2_Addressee": 83,
+        "Address1_Addressee": 83,
+        "Address1_line1": 150,
+        "Address1_line2": 150,
+        "Address1_city": 50,
+        "Address1_phone": 21,
+        "Address2_line1": 150,
+        "Address2_line2": 150,
+        "Address2_city": 50,
+        "Address2_phone": 21,
+        "accountNumber": 99,
+        "vatregnumber": 50,
+    },
+    "email": ["email"],
+    "phone": {
+        "phone": ["Address1_country", "Address2_country"],
+        "Address1_phone": ["Address1_country"],
+        "Address2_phone": ["Address2_country"],
+    },
+    "boolean": [
+        "isPerson", "isInactive",
+        "Address1_defaultBilling", "Address1_defaultShipping",
+        "Address2_defaultBilling", "Address2_defaultShipping",
+    ],
+    "required_if": [
+        {"column": "companyName", "label": "Company Name", "when": "isPerson", "equals": "FALSE"},
+        {"column": "firstName", "label": "First Name", "when": "isPerson", "equals": "TRUE"},
+        {"column": "lastName", "label": "Last Name", "when": "isPerson", "equals": "TRUE"},
+    ],
+    "required": ["subsidiary", "Address1_country", "Address2_country"],
+    "format": {
+        "subsidiary": {
+            "pattern": SUBSIDIARY_HIERARCHY_PATTERN,
+            "message": "has invalid subsidiary hierarchy format",
+        },
+    },
+    "allowed_values": {
+        "Address1_country": "countries",
+        "Address2_country": "countries",
+        "terms": "terms",
+        "currency": "currencies",
+    },
+    "hierarchy": {
+        "subsidiary": "subsidiaries",
+    },
+}
+
+TEMPLATE_RULES = {
+    "Customer Template": CUSTOMER_TEMPLATE_RULES,
+    # Add the rules of other templates here
+}
@@ -0,0 +1,97 @@
+import os
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+import openpyxl
+
+# Directory scanned for template workbooks; every "<name>.xlsx" becomes template "<name>"
+TEMPLATE_DIR = Path(os.environ.get("IMPORT_WIZARD_TEMPLATE_DIR", Path(__file__).parent / "templates"))
+
+
+class TemplateInfo(NamedTuple):
+    """
+    Header row and metadata of a template workbook.
+
+    `labels` maps each column to the display name in the row under the
+    headers, when the template has one.
+    """
+    name: str
+    path: Path
+    columns: list
+    labels: dict
+    mtime_ns: int
+    size: int
+
+
+# Process-wide cache shared by all sessions: path -> TemplateInfo
+_template_cache = {}
+_cache_lock = threading.Lock()
+
+
+def discover_templates(template_dir=TEMPLATE_DIR):
+    """
+    Finds the template workbooks in `template_dir`.
+
+    Returns:
+        dict: Template name -> path, sorted by name.
+    """
+    template_dir = Path(template_dir)
+    if not template_dir.is_dir():
+        return {}
+    found = {
+        Path(entry.name).stem: Path(entry.path)
+        for entry in os.scandir(template_dir)
+        # Skip the lock files Excel leaves next to open workbooks
+        if entry.is_file() and entry.name.lower().endswith(".xlsx") and not entry.name.startswith("~$")
+    }
+    return dict(sorted(found.items()))
+
+
+def read_template_headers(path):
+    """
+    Reads only the first two rows of a workbook: the headers and their labels.
+    """
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(min_row=1, max_row=2, values_only=True)
+        header = next(rows, ())
+        label_row = next(rows, ())
+    finally:
+        workbook.close()
+
+    columns = [str(name) for name in header if name is not None]
+    labels = {
+        str(name): str(label)
+        for name, label in zip(header, label_row)
+        if name is not None and label is not None
+    }
+    return columns, labels
+
+
+def get_template(name, template_dir=TEMPLATE_DIR):
+    """
+    Header row and metadata of a template, read once per process.
+
+    The cached entry is reused until the workbook's modification time or size
+    changes, so picking a template never parses the whole workbook again.
+
+    Raises:
+        KeyError: If there is no workbook for `name` in `template_dir`.
+    """
+    path = Path(template_dir) / f"{name}.xlsx"
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        raise KeyError(f"Template not found: {name}") from None
+
+    with _cache_lock:
+        cached = _template_cache.get(path)
+    if cached is not None and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+        return cached
+
+    columns, labels = read_template_headers(path)
+    info = TemplateInfo(name, path, columns, labels, stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        _template_cache[path] = info
+    return info
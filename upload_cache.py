@@ -0,0 +1,94 @@
+import hashlib
+import io
+from collections import OrderedDict
+
+import pandas as pd
+
+import column_stats
+import ingest
+
+# With copy-on-write (always on from pandas 3) a shallow copy is enough to keep
+# the frames handed out independent of the cached ones; older pandas needs deep copies
+COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3
+
+# Memory budget of the parsed uploads kept for one session
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 4
+
+
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+class UploadCache:
+    """
+    Parsed uploads of one session, keyed by a hash of the uploaded bytes.
+
+    Entries are evicted least recently used first once the cache holds more
+    than `max_entries` frames or `max_bytes` of frame memory; the newest entry
+    is always kept. Frames are handed out as copies (shallow under
+    copy-on-write), so changing them never changes the cached frame.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._frames = OrderedDict()  # key -> (frame, size in bytes)
+        self._stats = {}  # key -> column statistics of the cached frame
+        self._hashes = {}  # Streamlit file id -> content hash, so the bytes are hashed once
+
+    def _key(self, uploaded_file, nrows, engine):
+        file_id = getattr(uploaded_file, "file_id", None)
+        digest = self._hashes.get(file_id) if file_id is not None else None
+        if digest is None:
+            digest = content_hash(uploaded_file.getvalue())
+            if file_id is not None:
+                self._hashes[file_id] = digest
+        return (digest, ingest.get_file_extension(uploaded_file.name), nrows, engine)
+
+    def read(self, uploaded_file, nrows=None, engine=None):
+        """
+        Parsed contents of an uploaded CSV/Excel file, read at most once per session.
+
+        Parameters:
+            uploaded_file: Streamlit UploadedFile (or any object with `name` and `getvalue()`).
+            nrows (int): Only read the first `nrows` rows.
+            engine (str): Reader engine, see `ingest.available_engines`.
+
+        Returns:
+            pd.DataFrame: A copy of the cached frame.
+        """
+        key = self._key(uploaded_file, nrows, engine)
+        if key in self._frames:
+            self._frames.move_to_end(key)
+        else:
+            file_extension = key[1]
+            frame = ingest.read_file(
+                io.BytesIO(uploaded_file.getvalue()), file_extension, nrows=nrows, engine=engine
+            )
+            self._frames[key] = (frame, int(frame.memory_usage(deep=True).sum()))
+            self._evict()
+        return self._frames[key][0].copy(deep=not COPY_ON_WRITE)
+
+    def column_stats(self, uploaded_file, nrows=None, engine=None):
+        """
+        Per-column statistics of an upload (see `column_stats.profile_columns`),
+        computed once and kept as long as the parsed upload is cached.
+        """
+        frame = self.read(uploaded_file, nrows, engine)
+        key = self._key(uploaded_file, nrows, engine)
+        if key not in self._stats:
+            self._stats[key] = column_stats.profile_columns(frame)
+        return self._stats[key]
+
+    def _evict(self):
+        total = sum(size for _, size in self._frames.values())
+        while len(self._frames) > 1 and (len(self._frames) > self.max_entries or total > self.max_bytes):
+            key, (_, size) = self._frames.popitem(last=False)
+            self._stats.pop(key, None)
+            total -= size
+
+    def clear(self):
+        self._frames.clear()
+        self._stats.clear()
+        self._hashes.clear()
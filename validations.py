@@ -1,305 +1,551 @@
 import pandas as pd
-import re
-import streamlit as st
-from email_validator import validate_email, EmailNotValidError
 import numpy as np
-import phonenumbers
-
-# List of valid countries
-VALID_COUNTRIES = [
-    "Afghanistan", "Albania", "Algeria", "American Samoa", "Andorra", "Angola", "Anguilla", "Antarctica",
-    "Antigua and Barbuda", "Argentina", "Armenia", "Aruba", "Australia", "Austria", "Azerbaijan", "Bahamas",
-    "Bahrain", "Bangladesh", "Barbados", "Belarus", "Belgium", "Belize", "Benin", "Bermuda", "Bhutan",
-    "Bolivia (Plurinational State of)", "Bonaire, Sint Eustatius and Saba", "Bosnia and Herzegovina",
-    "Botswana", "Bouvet Island", "Brazil", "British Indian Ocean Territory", "Brunei Darussalam", "Bulgaria",
-    "Burkina Faso", "Burundi", "Cabo Verde", "Cambodia", "Cameroon", "Canada", "Canary Islands", "Cayman Islands",
-    "Central African Republic", "Ceuta and Melilla", "Chad", "Chile", "China", "Christmas Island",
-    "Cocos (Keeling) Islands", "Colombia", "Comoros", "Congo", "Congo (the Democratic Republic of the)",
-    "Cook Islands", "Costa Rica", "Croatia", "Cuba", "Curaçao", "Cyprus", "Czechia", "Côte d'Ivoire",
-    "Denmark", "Djibouti", "Dominica", "Dominican Republic", "Ecuador", "Egypt", "El Salvador",
-    "Equatorial Guinea", "Eritrea", "Estonia", "Eswatini", "Ethiopia", "Falkland Islands (Malvinas)",
-    "Faroe Islands", "Fiji", "Finland", "France", "French Guiana", "French Polynesia", "French Southern Territories",
-    "Gabon", "Gambia", "Georgia", "Germany", "Ghana", "Gibraltar", "Greece", "Greenland", "Grenada",
-    "Guadeloupe", "Guam", "Guatemala", "Guernsey", "Guinea", "Guinea-Bissau", "Guyana", "Haiti",
-    "Heard Island and McDonald Islands", "Holy See", "Honduras", "Hong Kong", "Hungary", "Iceland", "India",
-    "Indonesia", "Iran (Islamic Republic of)", "Iraq", "Ireland", "Isle of Man", "Israel", "Italy", "Jamaica",
-    "Japan", "Jersey", "Jordan", "Kazakhstan", "Kenya", "Kiribati", "Korea (the Democratic People's Republic of)",
-    "Korea (the Republic of)", "Kosovo", "Kuwait", "Kyrgyzstan", "Lao People's Democratic Republic", "Latvia",
-    "Lebanon", "Lesotho", "Liberia", "Libya", "Liechtenstein", "Lithuania", "Luxembourg", "Macao", "Madagascar",
-    "Malawi", "Malaysia", "Maldives", "Mali", "Malta", "Marshall Islands", "Martinique", "Mauritania", "Mauritius",
-    "Mayotte", "Mexico", "Micronesia (Federated States of)", "Moldova (the Republic of)", "Monaco", "Mongolia",
-    "Montenegro", "Montserrat", "Morocco", "Mozambique", "Myanmar", "Namibia", "Nauru", "Nepal", "Netherlands",
-    "Netherlands Antilles (Deprecated)", "New Caledonia", "New Zealand", "Nicaragua", "Niger", "Nigeria", "Niue",
-    "Norfolk Island", "North Macedonia", "Northern Mariana Islands", "Norway", "Oman", "Pakistan", "Palau",
-    "Palestine, State of", "Panama", "Papua New Guinea", "Paraguay", "Peru", "Philippines", "Pitcairn", "Poland",
-    "Portugal", "Puerto Rico", "Qatar", "Romania", "Russian Federation", "Rwanda", "Réunion",
-    "Saint Barthélemy", "Saint Helena, Ascension and Tristan da Cunha", "Saint Kitts and Nevis", "Saint Lucia",
-    "Saint Martin (French part)", "Saint Pierre and Miquelon", "Saint Vincent and the Grenadines", "Samoa",
-    "San Marino", "Sao Tome and Principe", "Saudi Arabia", "Senegal", "Serbia", "Serbia and Montenegro (Deprecated)",
-    "Seychelles", "Sierra Leone", "Singapore", "Sint Maarten (Dutch part)", "Slovakia", "Slovenia", "Solomon Islands",
-    "Somalia", "South Africa", "South Georgia and the South Sandwich Islands", "South Sudan", "Spain", "Sri Lanka",
-    "Sudan", "Suriname", "Svalbard and Jan Mayen", "Sweden", "Switzerland", "Syrian Arab Republic",
-    "Taiwan (Province of China)", "Tajikistan", "Tanzania, the United Republic of", "Thailand", "Timor-Leste",
-    "Togo", "Tokelau", "Tonga", "Trinidad and Tobago", "Tunisia", "Turkmenistan", "Turks and Caicos Islands",
-    "Tuvalu", "Türkiye", "Uganda", "Ukraine", "United Arab Emirates", "United Kingdom", "United States",
-    "United States Minor Outlying Islands", "Uruguay", "Uzbekistan", "Vanuatu", "Venezuela (Bolivarian Republic of)",
-    "Viet Nam", "Virgin Islands (British)", "Virgin Islands (U.S.)", "Wallis and Futuna", "Western Sahara",
-    "Yemen", "Zambia", "Zimbabwe", "Åland Islands"
-]
-
-# Valid terms for validation
-VALID_TERMS = [
-    "1% 10 Net 30", "2% 10 Net 30", "Due on receipt", 
-    "Net 15", "Net 30", "Net 45", "Net 60"
-]
-
-# Valid currency codes for validation
-VALID_CURRENCIES = [
-    "AFN", "ALL", "DZD", "USD", "EUR", "AOA", "XCD", "ARS", "AMD", "AWG", "AUD", 
-    "AZN", "BSD", "BHD", "BDT", "BBD", "BYN", "BZD", "XOF", "BMD", "BTN", "INR", 
-    "BOB", "BOV", "BAM", "BWP", "NOK", "BRL", "BND", "BGN", "BIF", "CVE", "KHR", 
-    "XAF", "CAD", "KYD", "CLF", "CLP", "CNY", "COP", "COU", "KMF", "CDF", "NZD", 
-    "CRC", "CUC", "CUP", "ANG", "CZK", "DKK", "DJF", "DOP", "EGP", "SVC", "ERN", 
-    "ETB", "FKP", "FJD", "GMD", "GEL", "GHS", "GIP", "GTQ", "GBP", "GNF", "GYD", 
-    "HTG", "HNL", "HKD", "HUF", "ISK", "IDR", "XDR", "IRR", "IQD", "ILS", "JMD", 
-    "JPY", "JOD", "KZT", "KES", "KPW", "KRW", "KWD", "KGS", "LAK", "LBP", "LSL", 
-    "ZAR", "LRD", "LYD", "CHF", "MOP", "MGA", "MWK", "MYR", "MVR", "MRU", "MUR", 
-    "MXN", "MXV", "MDL", "MNT", "MAD", "MZN", "MMK", "NAD", "NPR", "NIO", "NGN", 
-    "OMR", "PKR", "PAB", "PGK", "PYG", "PEN", "PHP", "PLN", "QAR", "MKD", "RON", 
-    "RUB", "RWF", "SHP", "WST", "STN", "SAR", "RSD", "SCR", "SLE", "SGD", "ANG", 
-    "SBD", "SOS", "SSP", "LKR", "SDG", "SRD", "SZL", "SEK", "CHE", "CHW", "SYP", 
-    "TWD", "TJS", "TZS", "THB", "TOP", "TTD", "TND", "TRY", "TMT", "UGX", "UAH", 
-    "AED", "USN", "UYI", "UYU", "UZS", "VUV", "VEF", "VND", "XPF", "YER", "ZMW", 
-    "ZWL"
-]
-
-def format_errors_with_table(index_series, column_name, error_message):
-    error_table = pd.DataFrame({
-        "Row Index": index_series.index + 2,
-        column_name: index_series.values
-    })
-    st.write(f"❌ Errors in {column_name}, {error_message}:\n")
-    st.dataframe(error_table, hide_index=True)
-    return column_name
+import hashlib
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, NamedTuple
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional; validation then runs on one core
+    pa = None
+
+import emails
+import hierarchies
+import ingest
+import phones
+import vocabularies
+from issues import Issue, IssueSet, make_issue
+from template_rules import TEMPLATE_RULES
+
+
+# Issue message of the `allowed_values` rules per vocabulary
+VOCABULARY_MESSAGES = {
+    "countries": "contains invalid country names",
+    "terms": "contains invalid payment terms",
+    "currencies": "contains invalid currency codes",
+}
+
+# Placeholder key so missing IDs can be tracked in the set of seen values
+MISSING_KEY = "\x00<missing>"
+
+# Fewest rows worth handing to a worker process when validating in shards
+MIN_SHARD_ROWS = 50_000
+
+# Shards are exchanged as memory-mapped Arrow files; /dev/shm keeps them in RAM where it exists
+SHARD_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Shard workers are started by a fork server (or spawned where there is none), never forked
+# from the caller: forking a process with running threads can copy locks other threads hold
+SHARD_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
 
 # Helper Validation Functions
-def validate_unique(column, column_name):
-    duplicates = column[column.duplicated()]
-    if not duplicates.empty:
-        return format_errors_with_table(duplicates, column_name, "duplicate values found")
-    return None
-
-def validate_conditional(dataframe, condition_col, condition_val, target_col, target_name):
-    invalid_rows = dataframe[
-        (dataframe[condition_col] == condition_val) & dataframe[target_col].isnull()
-    ][target_col]
-    if not invalid_rows.empty:
-        return format_errors_with_table(invalid_rows, target_name, f"missing values in '{target_name}' when '{condition_col}' is '{condition_val}'")
-    return None
-
-def validate_length(column, max_length, column_name):
-    too_long = column[column.str.len() > max_length]
-    if not too_long.empty:
-        return format_errors_with_table(too_long, column_name, f"values exceed the maximum length of {max_length}")
-    return None
+def validate_unique(column, column_name, seen=None):
+    duplicated = column.duplicated()
+    if seen is not None:
+        # Values already seen in earlier chunks of the same file are duplicates too
+        keys = column[~duplicated].fillna(MISSING_KEY)
+        repeated = keys[[key in seen for key in keys]]
+        seen.update(keys)
+        duplicated.loc[repeated.index] = True
+    return make_issue("unique", column[duplicated], column_name, "duplicate values found")
+
+def validate_conditional(condition, condition_val, target, target_name, target_missing=None):
+    if target_missing is None:
+        target_missing = target.isnull()
+    invalid_rows = target[(condition == condition_val) & target_missing]
+    return make_issue(
+        "required_if", invalid_rows, target.name,
+        f"missing values in '{target_name}' when '{condition.name}' is '{condition_val}'"
+    )
+
+def validate_length(column, max_length, column_name, lengths=None):
+    if lengths is None:
+        lengths = column.str.len()
+    too_long = column[lengths > max_length]
+    return make_issue("max_length", too_long, column_name, f"values exceed the maximum length of {max_length}")
 
 def validate_emails(column, column_name):
-    invalid_emails = []
-    for email in column:
-        try:
-            # Validate email and normalize
-            emailinfo = validate_email(email, check_deliverability=False)
-            normalized_email = emailinfo.normalized
-        except EmailNotValidError as e:
-            invalid_emails.append(email)
-    
-    if invalid_emails:
-        return format_errors_with_table(pd.Series(invalid_emails), column_name, "invalid email format")
-    
-    return None
-
-def validate_phone_number(phone, subsidiary_country='US'):
-    if pd.isnull(phone):
-        return
-    
-    # Skip single quote character if it exists as the first character
-    if phone.startswith("'"):
-        phone = phone[1:]
-
-    # Check maximum length
-    if len(phone) > 32:
-        return "Invalid phone number: exceeds maximum length of 32 characters"
-
-    # Check for emergency service phone numbers (commonly start with specific digits)
-    emergency_numbers = ['112', '911', '999', '100', '101', '102']  # Add more if necessary
-    if any(phone.startswith(emergency) for emergency in emergency_numbers):
-        return "Valid emergency service number"
-
-    # Attempt to parse the phone number
-    try:
-        if phone.startswith('+'):
-            parsed_number = phonenumbers.parse(phone)
-        else:
-            # Assuming a default country code; adjust as needed
-            parsed_number = phonenumbers.parse(phone, subsidiary_country)
-
-        # Validate the phone number
-        if phonenumbers.is_valid_number(parsed_number) or phonenumbers.is_possible_number(parsed_number):
-            # Return the formatted number if valid
-            return "Valid phone number"
-
-    except phonenumbers.NumberParseException as e:
-        return f"Invalid phone number parsing: {e}"
-    
-    except phonenumbers.PhoneNumberFormatException as e:
-        return f"Invalid phone number format: {e}"
-
-    return f"Invalid phone number: {phone}"
-
-def validate_phone(column, column_name):
-    # Apply `validate_phone_number` to the column
-    phone_validation_results = column.apply(validate_phone_number)
-
-    # Identify invalid phone numbers
-    invalid_phones = phone_validation_results[phone_validation_results.str.contains("Invalid", na=False)]
-    if not invalid_phones.empty:
-        return format_errors_with_table(invalid_phones, column_name, "invalid phone number format")
-
-    return None
-
-def validate_boolean(column, column_name):
-    invalid_values = column[~column.isin(["TRUE", "FALSE"])]
-    if not invalid_values.empty:
-        return format_errors_with_table(invalid_values, column_name, "contains values that are not boolean (TRUE, FALSE)")
-    return None
-
-def validate_subsidiary(column, column_name):
-    errors = []
-    # Check for missing values
-    missing_subsidiary = column[column.isnull() | column.str.strip().eq("")]
-    if not missing_subsidiary.empty:
-        errors.append(format_errors_with_table(missing_subsidiary, column_name, "contains missing values"))
-    
-    # Validate format
-    hierarchy_regex = r'^([^\|:]+(:[^\|:]+)*)(\|([^\|:]+(:[^\|:]+)*))*$'
-    invalid_format = column[~column.str.match(hierarchy_regex, na=False)]
-    if not invalid_format.empty:
-        errors.append(format_errors_with_table(invalid_format, column_name, "has invalid subsidiary hierarchy format"))
-    
-    return "\n".join(errors) if errors else None
-
-def validate_country(column, column_name):
-    invalid_countries = column[~column.isin(VALID_COUNTRIES)]
-    if not invalid_countries.empty:
-        return format_errors_with_table(invalid_countries, column_name, "contains invalid country names")
-    return None
-
-def validate_null_values(column, column_name):
-    null_rows = column[column.isnull()]
-    if not null_rows.empty:
-        return format_errors_with_table(null_rows, column_name, "contains null (missing) values")
-    return None
-
-def validate_terms(column, column_name):
-    invalid_terms = column[~column.isin(VALID_TERMS)]
-    if not invalid_terms.empty:
-        return format_errors_with_table(
-            invalid_terms, column_name, 
-            "contains invalid payment terms"
+    invalid_mask, _ = emails.check_emails(column)
+    return make_issue("email", column[invalid_mask], column_name, "invalid email format")
+
+def validate_phone(column, column_name, regions=None):
+    invalid_mask, _ = phones.check_phones(column, regions)
+    return make_issue("phone", column[invalid_mask], column_name, "invalid phone number format")
+
+def validate_boolean(column, column_name, codes=None):
+    if codes is None:
+        codes = vocabularies.encode(column, "booleans", case_insensitive=True).cat.codes
+    invalid_values = column[codes.to_numpy() == -1]
+    return make_issue("boolean", invalid_values, column_name, "contains values that are not boolean (TRUE, FALSE)")
+
+def validate_required(column, column_name, missing=None):
+    if missing is None:
+        missing = column.isnull() | column.str.strip().eq("")
+    return make_issue("required", column[missing], column_name, "contains null (missing) values")
+
+def validate_format(column, pattern, column_name, message):
+    invalid_format = column[~column.str.match(pattern, na=True)]
+    return make_issue("format", invalid_format, column_name, message)
+
+def validate_allowed_values(column, vocabulary, column_name, missing=None, codes=None, skip_missing=True):
+    if codes is None:
+        codes = vocabularies.encode(column, vocabulary).cat.codes
+    invalid = codes.to_numpy() == -1
+    if skip_missing:
+        if missing is None:
+            missing = column.isnull()
+        invalid &= ~missing.to_numpy()
+    invalid_values = column[invalid]
+    return make_issue("allowed_values", invalid_values, column_name, VOCABULARY_MESSAGES[vocabulary])
+
+
+# Validation Plans
+class ColumnCache:
+    """
+    Per-column values derived during one validation pass.
+
+    Lengths, missing-value masks, upper-cased values and vocabulary codes are
+    computed the first time a rule asks for them and shared with every later
+    rule, and columns no rule asks for are never touched.
+    """
+
+    def __init__(self, dataframe):
+        self.dataframe = dataframe
+        self._derived = {}
+
+    def _get(self, kind, column_name, compute):
+        key = (kind, column_name)
+        if key not in self._derived:
+            self._derived[key] = compute(self.dataframe[column_name])
+        return self._derived[key]
+
+    def column(self, column_name):
+        return self.dataframe[column_name]
+
+    def lengths(self, column_name):
+        return self._get("lengths", column_name, lambda column: column.str.len())
+
+    def nulls(self, column_name):
+        return self._get("nulls", column_name, lambda column: column.isnull())
+
+    def missing(self, column_name):
+        # Missing or blank
+        return self._get(
+            "missing", column_name,
+            lambda column: self.nulls(column_name) | column.str.strip().eq("")
+        )
+
+    def upper(self, column_name):
+        return self._get("upper", column_name, lambda column: column.str.upper())
+
+    def codes(self, column_name, vocabulary, case_insensitive=False):
+        # Categorical codes over the vocabulary; -1 marks values outside it
+        return self._get(
+            ("codes", vocabulary, case_insensitive), column_name,
+            lambda column: vocabularies.encode(column, vocabulary, case_insensitive).cat.codes
         )
-    return None
-
-def validate_currency(column, column_name):
-    invalid_currencies = column[~column.isin(VALID_CURRENCIES)]
-    if not invalid_currencies.empty:
-        return format_errors_with_table(
-            invalid_currencies, column_name, 
-            "contains invalid currency codes"
+
+
+class RuleStep(NamedTuple):
+    """
+    One compiled check: `check(cache, unique_state)` returns its issues.
+
+    The step only runs when all `required` columns are present; `columns`
+    lists every column the check may read. `params` holds the rule settings
+    that, with the contents of `columns`, determine the result; `reference`
+    returns the current version of any reference data the check also reads
+    (e.g. a file's modification time), so cached results follow its changes.
+    Row-local steps judge every row on its own values, so they can run on
+    any slice of the rows; the others (such as uniqueness) need the whole
+    column.
+    """
+    rule: str
+    column: str
+    required: tuple
+    columns: tuple
+    params: tuple
+    check: Callable
+    row_local: bool = True
+    reference: Callable = None
+
+
+def compile_plan(rules):
+    """
+    Compiles the declarative rules of a template (see `template_rules`) into
+    an ordered list of RuleSteps.
+    """
+    plan = []
+
+    def add(rule, column, check, required=None, optional=(), params=(), row_local=True, reference=None):
+        required = tuple(required or (column,))
+        plan.append(RuleStep(
+            rule, column, required, required + tuple(optional), tuple(params), check, row_local, reference
+        ))
+
+    for column in rules.get("unique", []):
+        add("unique", column, lambda cache, state, column=column: validate_unique(
+            cache.column(column), column,
+            state.setdefault(column, set()) if state is not None else None,
+        ), row_local=False)
+
+    for column, max_length in rules.get("max_length", {}).items():
+        add("max_length", column, lambda cache, state, column=column, max_length=max_length: validate_length(
+            cache.column(column), max_length, column, cache.lengths(column)
+        ), params=(max_length,))
+
+    for column in rules.get("email", []):
+        add("email", column, lambda cache, state, column=column: validate_emails(cache.column(column), column))
+
+    for column, country_columns in rules.get("phone", {}).items():
+        add("phone", column, lambda cache, state, column=column, country_columns=country_columns: validate_phone(
+            cache.column(column), column, phones.regions_from_countries(cache.dataframe, country_columns)
+        ), optional=country_columns, params=tuple(country_columns))
+
+    for column in rules.get("boolean", []):
+        add("boolean", column, lambda cache, state, column=column: validate_boolean(
+            cache.column(column), column, cache.codes(column, "booleans", case_insensitive=True)
+        ))
+
+    for condition in rules.get("required_if", []):
+        add("required_if", condition["column"], lambda cache, state, condition=condition: validate_conditional(
+            cache.upper(condition["when"]), condition["equals"],
+            cache.column(condition["column"]), condition["label"], cache.nulls(condition["column"]),
+        ), required=(condition["column"], condition["when"]), params=tuple(sorted(condition.items())))
+
+    for column in rules.get("required", []):
+        add("required", column, lambda cache, state, column=column: validate_required(
+            cache.column(column), column, cache.missing(column)
+        ))
+
+    for column, spec in rules.get("format", {}).items():
+        add("format", column, lambda cache, state, column=column, spec=spec: validate_format(
+            cache.column(column), spec["pattern"], column, spec["message"]
+        ), params=(spec["pattern"], spec["message"]))
+
+    # Missing values of required columns are reported by the required rule; in optional
+    # columns they are not among the allowed values either
+    required_columns = set(rules.get("required", []))
+    for column, vocabulary in rules.get("allowed_values", {}).items():
+        skip_missing = column in required_columns
+        add("allowed_values", column, lambda cache, state, column=column, vocabulary=vocabulary, skip_missing=skip_missing:
+            validate_allowed_values(
+                cache.column(column), vocabulary, column, cache.nulls(column), cache.codes(column, vocabulary),
+                skip_missing,
+            ), params=(vocabulary, skip_missing))
+
+    for column, reference in rules.get("hierarchy", {}).items():
+        add("hierarchy", column, lambda cache, state, column=column, reference=reference: hierarchies.validate_hierarchy(
+            cache.column(column), column, hierarchies.get_index(reference)
+        ), params=(reference,), reference=lambda reference=reference: hierarchies.reference_version(reference))
+
+    return plan
+
+
+def step_stage(step):
+    """
+    Profiler stage name of a plan step, e.g. "rule.email.email".
+    """
+    return f"rule.{step.rule}.{step.column}"
+
+
+def _run_step(step, cache, unique_state, profiler):
+    if profiler is None:
+        return step.check(cache, unique_state)
+    with profiler.stage(step_stage(step), len(cache.dataframe), len(step.columns)):
+        return step.check(cache, unique_state)
+
+
+def run_plan(plan, dataframe, unique_state=None, profiler=None, progress=None):
+    """
+    Runs a compiled plan over a DataFrame in a single pass.
+
+    `unique_state` is only needed when a file is validated chunk by chunk: it
+    keeps the IDs seen in earlier chunks so duplicates across chunks are found.
+    With a `profiling.Profiler`, every step is recorded as its own stage, and
+    `progress(done, total, message)` is called before each step.
+
+    Returns:
+        IssueSet: Issues found by all steps.
+    """
+    cache = ColumnCache(dataframe)
+    errors = IssueSet()
+    runnable = [step for step in plan if all(column in dataframe.columns for column in step.required)]
+    for done, step in enumerate(runnable):
+        if progress is not None:
+            progress(done, len(runnable), step_stage(step))
+        errors.add(_run_step(step, cache, unique_state, profiler))
+    return errors
+
+
+def _write_shard_file(dataframe, columns):
+    # Index labels travel as a column so every shard reports rows of the whole frame
+    table = pa.table(
+        {"__index__": pa.array(dataframe.index.to_numpy())}
+        | {column: pa.array(dataframe[column].astype(ingest.STRING_DTYPE), type=pa.string()) for column in columns}
+    )
+    handle, path = tempfile.mkstemp(suffix=".arrow", dir=SHARD_DIR)
+    with os.fdopen(handle, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return path
+
+
+def _collect(results, issue):
+    # Steps return an Issue, a list of Issues (one per message) or None
+    if isinstance(issue, list):
+        results.extend(issue)
+    else:
+        results.append(issue)
+
+
+def _merge_shards(issues):
+    # One Issue per message, as `run_plan` gives: the parts of every shard joined in row order
+    parts = {}
+    for issue in issues:
+        if issue is not None:
+            parts.setdefault(issue.message, []).append(issue)
+    return [
+        Issue(
+            group[0].rule, group[0].column, message,
+            np.concatenate([issue.rows for issue in group]), np.concatenate([issue.values for issue in group]),
+        ) if len(group) > 1 else group[0]
+        for message, group in parts.items()
+    ]
+
+
+def _run_shard(path, template, step_indexes, start, stop, timed=False):
+    # Runs in a worker process: maps the Arrow file without copying and validates rows [start, stop).
+    # When timed, each result also carries the step's wall and CPU seconds.
+    plan = PLANS[template]
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all().slice(start, stop - start)
+        shard = table.drop_columns(["__index__"]).to_pandas(
+            types_mapper=lambda arrow_type: ingest.STRING_DTYPE if arrow_type == pa.string() else None
         )
-    return None
+        shard.index = table.column("__index__").to_numpy()
+        cache = ColumnCache(shard)
+        results = []
+        for index in step_indexes:
+            wall, cpu = time.perf_counter(), time.process_time()
+            issue = plan[index].check(cache, None)
+            timing = (time.perf_counter() - wall, time.process_time() - cpu) if timed else None
+            results.append((index, issue, timing))
+        return results
+
+
+def shard_executor(workers):
+    """
+    Process pool for `run_sharded`, with workers started by SHARD_START_METHOD.
+
+    Passing one pool to every `run_sharded` call of a file (or of the whole
+    app) saves starting new workers, which import the validation modules
+    afresh, for every call.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(SHARD_START_METHOD))
+
+
+def run_sharded(template, dataframe, unique_state=None, workers=None, profiler=None, progress=None, executor=None):
+    """
+    Runs a template's plan with its row-local steps spread over worker processes.
+
+    The columns read by the row-local steps are written once to a
+    memory-mapped Arrow file that every worker maps without copying or
+    pickling, and each worker validates one contiguous shard of rows.
+    Steps that need the whole column (uniqueness) run in this process over
+    all rows, with `unique_state` as in `run_plan`. The issues come out in
+    the same order as with `run_plan`. Small frames, or a single worker,
+    fall back to `run_plan`. When the run stops early (a cancelled job
+    raising from `progress`, or a failing step), shards that have not
+    started are cancelled instead of waited for.
+
+    Parameters:
+        template (str): Template name, a key of PLANS.
+        dataframe (pd.DataFrame): Data with template column names.
+        unique_state (dict): See `run_plan`.
+        workers (int): Worker processes; all CPU cores when omitted.
+        profiler (profiling.Profiler): Records every step; worker steps are
+            recorded once per shard, without memory figures.
+        progress (callable): `progress(done, total, message)`, called per
+            global step and per finished shard.
+        executor (ProcessPoolExecutor): Pool to run the shards on, see
+            `shard_executor`; a pool of `workers` processes is started for
+            this call when omitted.
+
+    Returns:
+        IssueSet: Issues found by all steps.
+    """
+    plan = PLANS[template]
+    workers = workers or os.cpu_count() or 1
+    shard_count = min(workers, len(dataframe) // MIN_SHARD_ROWS)
+    if pa is None or shard_count < 2:
+        return run_plan(plan, dataframe, unique_state, profiler, progress)
+
+    runnable = [
+        index for index, step in enumerate(plan)
+        if all(column in dataframe.columns for column in step.required)
+    ]
+    local_steps = [index for index in runnable if plan[index].row_local]
+    columns = sorted({
+        column for index in local_steps for column in plan[index].columns if column in dataframe.columns
+    })
+
+    results = {index: [] for index in runnable}
+    path = _write_shard_file(dataframe, columns)
+    owned = executor is None
+    if owned:
+        executor = shard_executor(shard_count)
+    futures, finished = [], False
+    try:
+        bounds = [math.ceil(len(dataframe) * shard / shard_count) for shard in range(shard_count + 1)]
+        futures = [
+            executor.submit(_run_shard, path, template, local_steps, start, stop, profiler is not None)
+            for start, stop in zip(bounds, bounds[1:])
+        ]
+        # Global steps run here while the workers are busy
+        cache = ColumnCache(dataframe)
+        global_steps = [index for index in runnable if not plan[index].row_local]
+        total = len(global_steps) + shard_count
+        for done, index in enumerate(global_steps):
+            if progress is not None:
+                progress(done, total, step_stage(plan[index]))
+            _collect(results[index], _run_step(plan[index], cache, unique_state, profiler))
+        # Shards are collected in row order, so each step's issues stay sorted by row
+        for shard, (future, start, stop) in enumerate(zip(futures, bounds, bounds[1:])):
+            if progress is not None:
+                progress(len(global_steps) + shard, total, f"shard {shard + 1} of {shard_count}")
+            for index, issue, timing in future.result():
+                _collect(results[index], issue)
+                if timing is not None:
+                    step = plan[index]
+                    profiler.add(step_stage(step), stop - start, len(step.columns), *timing)
+        finished = True
+    finally:
+        # After an early stop, queued shards never start and running ones are not waited for
+        for future in futures:
+            future.cancel()
+        if owned:
+            executor.shutdown(wait=finished, cancel_futures=True)
+        os.remove(path)
+
+    errors = IssueSet()
+    for index in runnable:
+        errors.add(_merge_shards(results[index]))
+    return errors
+
+
+def column_fingerprint(column):
+    """
+    Hash of a column's values and index labels.
+    """
+    hashes = pd.util.hash_pandas_object(column, index=True).to_numpy()
+    return hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()
+
+
+class IncrementalValidator:
+    """
+    Re-runs only the plan steps whose input columns changed since an earlier run.
+
+    The issues of every step are cached under the step's rule, parameters,
+    reference data version and the fingerprints of the columns it reads.
+    After a mapping change, only the steps reading a remapped column miss the
+    cache; all other results are reused. Least recently used results are
+    dropped beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        # Runs from background jobs of the same session never interleave
+        self._lock = threading.Lock()
+        # Steps run and reused by the last call to `run`
+        self.last_run = 0
+        self.last_reused = 0
+
+    def run(self, plan, dataframe, profiler=None, progress=None):
+        """
+        Same result as `run_plan(plan, dataframe)`, reusing cached step results.
+        Only the steps that actually run are recorded by `profiler`.
+        """
+        with self._lock:
+            return self._run(plan, dataframe, profiler, progress)
+
+    def _run(self, plan, dataframe, profiler, progress):
+        cache = ColumnCache(dataframe)
+        fingerprints = {}
+        errors = IssueSet()
+        self.last_run = self.last_reused = 0
+        runnable = [step for step in plan if all(column in dataframe.columns for column in step.required)]
+        for done, step in enumerate(runnable):
+            if progress is not None:
+                progress(done, len(runnable), step_stage(step))
+            inputs = []
+            for column in step.columns:
+                if column in dataframe.columns:
+                    if column not in fingerprints:
+                        fingerprints[column] = column_fingerprint(dataframe[column])
+                    inputs.append((column, fingerprints[column]))
+            reference = step.reference() if step.reference is not None else None
+            key = (step.rule, step.column, step.params, reference, tuple(inputs))
+
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.last_reused += 1
+            else:
+                self._results[key] = _run_step(step, cache, None, profiler)
+                self.last_run += 1
+                while len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+            errors.add(self._results[key])
+        return errors
+
+
+PLANS = {template: compile_plan(rules) for template, rules in TEMPLATE_RULES.items()}
 
 # Validation Rules for Templates
-def validate_customer_template(dataframe):
-    errors = []
-
-    # 1. External ID must be unique
-    if "externalId" in dataframe.columns:
-        errors.append(validate_unique(dataframe["externalId"], "External ID"))
-
-    # 2. Customer ID must be unique
-    if "entityId" in dataframe.columns:
-        errors.append(validate_unique(dataframe["entityId"], "Customer ID"))
-
-    # 3. Length Validations
-    length_constraints = {
-        "externalId": 100,
-        "entityId": 80,
-        "companyName": 83,
-        "firstName": 32,
-        "lastName": 32,
-        "email": 300,
-        "phone": 21,
-        "Address1_AddressName": 150,
-        "Address2_AddressName": 150,
-        "Address2_attention": 83,
-        "Address2_Addressee": 83,
-        "Address1_Addressee": 83,
-        "Address1_line1": 150,
-        "Address1_line2": 150,
-        "Address1_city": 50,
-        "Address1_phone": 21,
-        "Address2_line1": 150,
-        "Address2_line2": 150,
-        "Address2_city": 50,
-        "Address2_phone": 21,
-        "accountNumber": 99,
-        "vatregnumber": 50
-    }
-    for field, max_length in length_constraints.items():
-        if field in dataframe.columns:
-            errors.append(validate_length(dataframe[field].astype(str), max_length, field))
-
-    # 4. Email Validation
-    if "email" in dataframe.columns:
-        errors.append(validate_emails(dataframe["email"], "email"))
-
-    # 5. Phone Validation
-    for phone_field in ["phone", "Address1_phone", "Address2_phone"]:
-        if phone_field in dataframe.columns:
-            errors.append(validate_phone(dataframe[phone_field], phone_field))
-
-    # 6. Boolean Validations
-    for boolean_field in ["isPerson", "isInactive", "Address1_defaultBilling", "Address1_defaultShipping", "Address2_defaultBilling", "Address2_defaultShipping"]:
-        if boolean_field in dataframe.columns:
-            dataframe[boolean_field] = dataframe[boolean_field].str.upper()
-            errors.append(validate_boolean(dataframe[boolean_field], boolean_field))
-    
-    # 7. Conditional Fields
-    if "isPerson" in dataframe.columns:
-        if "companyName" in dataframe.columns:
-            errors.append(validate_conditional(dataframe, "isPerson", "FALSE", "companyName", "Company Name"))
-        if "firstName" in dataframe.columns:
-            errors.append(validate_conditional(dataframe, "isPerson", "TRUE", "firstName", "First Name"))
-        if "lastName" in dataframe.columns:
-            errors.append(validate_conditional(dataframe, "isPerson", "TRUE", "lastName", "Last Name"))
-
-
-    # 8. Subsidiary Validation
-    if "subsidiary" in dataframe.columns:
-        subsidiary_errors = validate_subsidiary(dataframe["subsidiary"].astype(str), "subsidiary")
-        errors.append(subsidiary_errors)
-
-    # 9. Country Validation
-    for country_field in ["Address1_country", "Address2_country"]:
-        if country_field in dataframe.columns:
-            errors.append(validate_country(dataframe[country_field].dropna(), country_field))
-            errors.append(validate_null_values(dataframe[country_field], country_field))
-
-    # 10. Terms and Currency
-    if "terms" in dataframe.columns:
-        errors.append(validate_terms(dataframe["terms"], "Terms"))
-    if "currency" in dataframe.columns:
-        errors.append(validate_currency(dataframe["currency"], "Currency"))
-
-    # Remove empty errors
-    return [error for error in errors if error]
+def validate_template(template, dataframe, unique_state=None, profiler=None, progress=None):
+    return run_plan(PLANS[template], dataframe, unique_state, profiler, progress)
+
+def validate_customer_template(dataframe, unique_state=None, profiler=None, progress=None):
+    """
+    Validates a Customer Template DataFrame and returns the IssueSet found.
+    """
+    return validate_template("Customer Template", dataframe, unique_state, profiler, progress)
+
+
+# Validation function for each template
+VALIDATIONS = {template: partial(validate_template, template) for template in PLANS}
+
+
+def validate_in_chunks(chunks, validation_function, column_mapping=None, profiler=None):
+    """
+    Runs a template validation over a file read in chunks (see `ingest.iter_chunks`).
+
+    Only one chunk is held in memory at a time. Uniqueness checks share their
+    state across chunks, and since chunk indexes continue from one chunk to the
+    next, the reported row numbers match the original file.
+
+    Parameters:
+        chunks (iterable): DataFrames making up the file, in order.
+        validation_function (callable): Template validation, e.g. `validate_customer_template`.
+        column_mapping (dict): Optional renaming applied to every chunk before validation.
+        profiler (profiling.Profiler): Passed on to `validation_function` when given.
+
+    Returns:
+        IssueSet: Issues of all chunks.
+    """
+    unique_state = {}
+    errors = IssueSet()
+    # Custom validation functions need not know about profiling
+    options = {"profiler": profiler} if profiler is not None else {}
+    for chunk in chunks:
+        if column_mapping:
+            chunk = chunk.rename(columns=column_mapping)
+        errors.extend(validation_function(chunk, unique_state=unique_state, **options))
+    return errors
@@ -0,0 +1,174 @@
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# SQLite file shared by all sessions and worker processes of the app
+CACHE_PATH = Path(os.environ.get(
+    "IMPORT_WIZARD_VERDICT_CACHE", Path(__file__).parent / "cache" / "verdicts.sqlite"
+))
+
+# Verdicts kept per check before the least recently used are evicted; 0 disables the cache
+MAX_ENTRIES = int(os.environ.get("IMPORT_WIZARD_VERDICT_CACHE_SIZE", 2_000_000))
+
+# Share of MAX_ENTRIES evicted at once, so eviction does not run after every upload
+EVICT_FRACTION = 0.1
+
+# Last-use times are only rewritten when older than this, sparing a write per cache hit
+TOUCH_INTERVAL_SECONDS = 3600
+
+# Keys sent to SQLite per statement batch
+LOOKUP_BATCH_SIZE = 500_000
+
+# Seconds to wait for another process's write before giving up on the cache
+BUSY_TIMEOUT_SECONDS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checks (
+    name TEXT PRIMARY KEY,
+    version TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS verdicts (
+    check_name TEXT NOT NULL,
+    key_hash INTEGER NOT NULL,
+    valid INTEGER NOT NULL,
+    result TEXT,
+    used_at INTEGER NOT NULL,
+    PRIMARY KEY (check_name, key_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS verdicts_used_at ON verdicts (check_name, used_at);
+"""
+
+
+def key_hashes(keys):
+    """
+    64-bit hashes of string keys, stable across processes and runs.
+    """
+    return pd.util.hash_array(np.asarray(keys, dtype=object), categorize=False).view(np.int64)
+
+
+class VerdictCache:
+    """
+    Results of an expensive per-value check, kept on disk across sessions.
+
+    Verdicts are stored under a 64-bit hash of the checked value and the
+    version of the check; when the version changes (a new library release or
+    a change to the rule), the old verdicts of the check are dropped the
+    next time the cache is opened. The least recently used verdicts are
+    evicted above `max_entries`. The file is opened in WAL mode, so several
+    app processes can read it while one writes, and a cache that cannot be
+    read or written (locked for too long, disk full) only means the values
+    are checked again.
+    """
+
+    def __init__(self, name, version, path=CACHE_PATH, max_entries=MAX_ENTRIES):
+        self.name = name
+        self.version = str(version)
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._checked_version = False
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        if not self._checked_version:
+            connection.execute("BEGIN IMMEDIATE")
+            stored = connection.execute("SELECT version FROM checks WHERE name = ?", (self.name,)).fetchone()
+            if stored is None or stored[0] != self.version:
+                connection.execute("DELETE FROM verdicts WHERE check_name = ?", (self.name,))
+                connection.execute("INSERT OR REPLACE INTO checks VALUES (?, ?)", (self.name, self.version))
+            connection.execute("COMMIT")
+            self._checked_version = True
+        return connection
+
+    def get(self, keys):
+        """
+        Looks up the verdicts of some values.
+
+        Parameters:
+            keys (list): Strings identifying each checked value.
+
+        Returns:
+            list: (valid, result) per key, None where the key is not cached.
+        """
+        if not self.max_entries or not len(keys):
+            return [None] * len(keys)
+        hashes = key_hashes(keys)
+        found = {}
+        now = int(time.time())
+        try:
+            with closing(self._connect()) as connection:
+                connection.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (key_hash INTEGER PRIMARY KEY)")
+                for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+                    part = np.sort(hashes[start:start + LOOKUP_BATCH_SIZE])
+                    connection.execute("BEGIN")
+                    connection.execute("DELETE FROM lookup")
+                    connection.executemany("INSERT OR IGNORE INTO lookup VALUES (?)", zip(part.tolist()))
+                    found.update(
+                        (key_hash, (bool(valid), result)) for key_hash, valid, result in connection.execute(
+                            "SELECT verdicts.key_hash, valid, result FROM lookup JOIN verdicts "
+                            "ON verdicts.check_name = ? AND verdicts.key_hash = lookup.key_hash",
+                            (self.name,),
+                        )
+                    )
+                    connection.execute("COMMIT")
+                    # Hits count as uses for the eviction order, at most once per interval
+                    connection.execute(
+                        "UPDATE verdicts SET used_at = ? WHERE check_name = ? AND used_at < ? "
+                        "AND key_hash IN (SELECT key_hash FROM lookup)",
+                        (now, self.name, now - TOUCH_INTERVAL_SECONDS),
+                    )
+        except sqlite3.Error:
+            return [None] * len(keys)
+        return [found.get(key_hash) for key_hash in hashes.tolist()]
+
+    def put(self, keys, verdicts):
+        """
+        Stores the (valid, result) verdicts of some values, evicting the least
+        recently used verdicts of the check when it holds more than `max_entries`.
+        """
+        if not self.max_entries or not len(keys):
+            return
+        now = int(time.time())
+        rows = [
+            (self.name, key_hash, int(valid), result, now)
+            for key_hash, (valid, result) in zip(key_hashes(keys).tolist(), verdicts)
+        ]
+        try:
+            with closing(self._connect()) as connection:
+                # IMMEDIATE takes the write lock up front, so concurrent writers queue instead of failing
+                connection.execute("BEGIN IMMEDIATE")
+                try:
+                    connection.executemany("INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?, ?)", rows)
+                    count = connection.execute(
+                        "SELECT COUNT(*) FROM verdicts WHERE check_name = ?", (self.name,)
+                    ).fetchone()[0]
+                    if count > self.max_entries:
+                        keep = int(self.max_entries * (1 - EVICT_FRACTION))
+                        connection.execute(
+                            "DELETE FROM verdicts WHERE check_name = ? AND key_hash IN ("
+                            "SELECT key_hash FROM verdicts WHERE check_name = ? ORDER BY used_at LIMIT ?)",
+                            (self.name, self.name, count - keep),
+                        )
+                    connection.execute("COMMIT")
+                except BaseException:
+                    connection.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error:
+            pass
+
+    def clear(self):
+        """
+        Drops every cached verdict of the check.
+        """
+        if not self.path.exists():
+            return
+        with closing(self._connect()) as connection:
+            connection.execute("DELETE FROM verdicts WHERE check_name = ?", (self.name,))
@@ -0,0 +1,123 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Reference vocabularies of the enumerated template columns. Rules refer to them
+# by name through VOCABULARIES; their categorical dtypes are built once per process.
+
+# List of valid countries
+VALID_COUNTRIES = [
+    "Afghanistan", "Albania", "Algeria", "American Samoa", "Andorra", "Angola", "Anguilla", "Antarctica",
+    "Antigua and Barbuda", "Argentina", "Armenia", "Aruba", "Australia", "Austria", "Azerbaijan", "Bahamas",
+    "Bahrain", "Bangladesh", "Barbados", "Belarus", "Belgium", "Belize", "Benin", "Bermuda", "Bhutan",
+    "Bolivia (Plurinational State of)", "Bonaire, Sint Eustatius and Saba", "Bosnia and Herzegovina",
+    "Botswana", "Bouvet Island", "Brazil", "British Indian Ocean Territory", "Brunei Darussalam", "Bulgaria",
+    "Burkina Faso", "Burundi", "Cabo Verde", "Cambodia", "Cameroon", "Canada", "Canary Islands", "Cayman Islands",
+    "Central African Republic", "Ceuta and Melilla", "Chad", "Chile", "China", "Christmas Island",
+    "Cocos (Keeling) Islands", "Colombia", "Comoros", "Congo", "Congo (the Democratic Republic of the)",
+    "Cook Islands", "Costa Rica", "Croatia", "Cuba", "Curaçao", "Cyprus", "Czechia", "Côte d'Ivoire",
+    "Denmark", "Djibouti", "Dominica", "Dominican Republic", "Ecuador", "Egypt", "El Salvador",
+    "Equatorial Guinea", "Eritrea", "Estonia", "Eswatini", "Ethiopia", "Falkland Islands (Malvinas)",
+    "Faroe Islands", "Fiji", "Finland", "France", "French Guiana", "French Polynesia", "French Southern Territories",
+    "Gabon", "Gambia", "Georgia", "Germany", "Ghana", "Gibraltar", "Greece", "Greenland", "Grenada",
+    "Guadeloupe", "Guam", "Guatemala", "Guernsey", "Guinea", "Guinea-Bissau", "Guyana", "Haiti",
+    "Heard Island and McDonald Islands", "Holy See", "Honduras", "Hong Kong", "Hungary", "Iceland", "India",
+    "Indonesia", "Iran (Islamic Republic of)", "Iraq", "Ireland", "Isle of Man", "Israel", "Italy", "Jamaica",
+    "Japan", "Jersey", "Jordan", "Kazakhstan", "Kenya", "Kiribati", "Korea (the Democratic People's Republic of)",
+    "Korea (the Republic of)", "Kosovo", "Kuwait", "Kyrgyzstan", "Lao People's Democratic Republic", "Latvia",
+    "Lebanon", "Lesotho", "Liberia", "Libya", "Liechtenstein", "Lithuania", "Luxembourg", "Macao", "Madagascar",
+    "Malawi", "Malaysia", "Maldives", "Mali", "Malta", "Marshall Islands", "Martinique", "Mauritania", "Mauritius",
+    "Mayotte", "Mexico", "Micronesia (Federated States of)", "Moldova (the Republic of)", "Monaco", "Mongolia",
+    "Montenegro", "Montserrat", "Morocco", "Mozambique", "Myanmar", "Namibia", "Nauru", "Nepal", "Netherlands",
+    "Netherlands Antilles (Deprecated)", "New Caledonia", "New Zealand", "Nicaragua", "Niger", "Nigeria", "Niue",
+    "Norfolk Island", "North Macedonia", "Northern Mariana Islands", "Norway", "Oman", "Pakistan", "Palau",
+    "Palestine, State of", "Panama", "Papua New Guinea", "Paraguay", "Peru", "Philippines", "Pitcairn", "Poland",
+    "Portugal", "Puerto Rico", "Qatar", "Romania", "Russian Federation", "Rwanda", "Réunion",
+    "Saint Barthélemy", "Saint Helena, Ascension and Tristan da Cunha", "Saint Kitts and Nevis", "Saint Lucia",
+    "Saint Martin (French part)", "Saint Pierre and Miquelon", "Saint Vincent and the Grenadines", "Samoa",
+    "San Marino", "Sao Tome and Principe", "Saudi Arabia", "Senegal", "Serbia", "Serbia and Montenegro (Deprecated)",
+    "Seychelles", "Sierra Leone", "Singapore", "Sint Maarten (Dutch part)", "Slovakia", "Slovenia", "Solomon Islands",
+    "Somalia", "South Africa", "South Georgia and the South Sandwich Islands", "South Sudan", "Spain", "Sri Lanka",
+    "Sudan", "Suriname", "Svalbard and Jan Mayen", "Sweden", "Switzerland", "Syrian Arab Republic",
+    "Taiwan (Province of China)", "Tajikistan", "Tanzania, the United Republic of", "Thailand", "Timor-Leste",
+    "Togo", "Tokelau", "Tonga", "Trinidad and Tobago", "Tunisia", "Turkmenistan", "Turks and Caicos Islands",
+    "Tuvalu", "Türkiye", "Uganda", "Ukraine", "United Arab Emirates", "United Kingdom", "United States",
+    "United States Minor Outlying Islands", "Uruguay", "Uzbekistan", "Vanuatu", "Venezuela (Bolivarian Republic of)",
+    "Viet Nam", "Virgin Islands (British)", "Virgin Islands (U.S.)", "Wallis and Futuna", "Western Sahara",
+    "Yemen", "Zambia", "Zimbabwe", "Åland Islands"
+]
+
+# Valid terms for validation
+VALID_TERMS = [
+    "1% 10 Net 30", "2% 10 Net 30", "Due on receipt",
+    "Net 15", "Net 30", "Net 45", "Net 60"
+]
+
+# Valid currency codes for validation
+VALID_CURRENCIES = [
+    "AFN", "ALL", "DZD", "USD", "EUR", "AOA", "XCD", "ARS", "AMD", "AWG", "AUD", 
+    "AZN", "BSD", "BHD", "BDT", "BBD", "BYN", "BZD", "XOF", "BMD", "BTN", "INR", 
+    "BOB", "BOV", "BAM", "BWP", "NOK", "BRL", "BND", "BGN", "BIF", "CVE", "KHR", 
+    "XAF", "CAD", "KYD", "CLF", "CLP", "CNY", "COP", "COU", "KMF", "CDF", "NZD", 
+    "CRC", "CUC", "CUP", "ANG", "CZK", "DKK", "DJF", "DOP", "EGP", "SVC", "ERN", 
+    "ETB", "FKP", "FJD", "GMD", "GEL", "GHS", "GIP", "GTQ", "GBP", "GNF", "GYD", 
+    "HTG", "HNL", "HKD", "HUF", "ISK", "IDR", "XDR", "IRR", "IQD", "ILS", "JMD", 
+    "JPY", "JOD", "KZT", "KES", "KPW", "KRW", "KWD", "KGS", "LAK", "LBP", "LSL", 
+    "ZAR", "LRD", "LYD", "CHF", "MOP", "MGA", "MWK", "MYR", "MVR", "MRU", "MUR", 
+    "MXN", "MXV", "MDL", "MNT", "MAD", "MZN", "MMK", "NAD", "NPR", "NIO", "NGN", 
+    "OMR", "PKR", "PAB", "PGK", "PYG", "PEN", "PHP", "PLN", "QAR", "MKD", "RON", 
+    "RUB", "RWF", "SHP", "WST", "STN", "SAR", "RSD", "SCR", "SLE", "SGD", "ANG", 
+    "SBD", "SOS", "SSP", "LKR", "SDG", "SRD", "SZL", "SEK", "CHE", "CHW", "SYP", 
+    "TWD", "TJS", "TZS", "THB", "TOP", "TTD", "TND", "TRY", "TMT", "UGX", "UAH", 
+    "AED", "USN", "UYI", "UYU", "UZS", "VUV", "VEF", "VND", "XPF", "YER", "ZMW", 
+    "ZWL"
+]
+
+# Values accepted by the `boolean` rules, compared case-insensitively
+BOOLEAN_VALUES = ["TRUE", "FALSE"]
+
+# Vocabulary name -> values, referenced by the `allowed_values` and `boolean` rules
+VOCABULARIES = {
+    "countries": VALID_COUNTRIES,
+    "terms": VALID_TERMS,
+    "currencies": VALID_CURRENCIES,
+    "booleans": BOOLEAN_VALUES,
+}
+
+
+@lru_cache(maxsize=None)
+def vocabulary_dtype(name):
+    """
+    Categorical dtype whose categories are the values of a vocabulary, built
+    once per process.
+    """
+    return pd.CategoricalDtype(list(dict.fromkeys(VOCABULARIES[name])))
+
+
+def encode(column, name, case_insensitive=False):
+    """
+    Encodes a column as a Categorical over the fixed categories of a vocabulary.
+
+    Values outside the vocabulary and missing values get code -1, so a
+    membership check is an integer comparison. Each distinct value is looked
+    up once and the codes are broadcast back to the rows.
+
+    Parameters:
+        column (pd.Series): Values to encode.
+        name (str): Vocabulary name, a key of VOCABULARIES.
+        case_insensitive (bool): Upper-case the values before the lookup
+            (the vocabulary must be upper-case).
+
+    Returns:
+        pd.Series: Categorical with the same index as `column`.
+    """
+    dtype = vocabulary_dtype(name)
+    row_codes, uniques = pd.factorize(column)
+    uniques = pd.Index(uniques, dtype=object)
+    if case_insensitive:
+        uniques = uniques.str.upper()
+    # Code -1 (missing) picks the trailing -1
+    unique_codes = np.append(dtype.categories.get_indexer(uniques), -1)
+    codes = unique_codes[row_codes]
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=dtype), index=column.index, name=column.name)
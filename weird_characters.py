@@ -1,49 +1,142 @@
-import re
+import unicodedata
+
 import pandas as pd
 
-# Define regex patterns for English and Arabic
-ENGLISH_CHARACTERS = re.compile(r'[\x20-\x7E\n]+')
-ARABIC_CHARACTERS = re.compile(r'[\x20-\x7E\u0600-\u06FF\u0750-\u077F\n]+')
+from issues import ROW_OFFSET
+
+# Columns of the changed-cell report returned by clean_columns
+DIFF_COLUMNS = ["row", "column", "original", "cleaned", "removed"]
+
+# Allowed characters per language, as inclusive (first, last) code point ranges
+PRINTABLE_ASCII = [(0x20, 0x7E), (0x0A, 0x0A)]
+ARABIC_SCRIPT = [(0x0600, 0x06FF), (0x0750, 0x077F)]
+LANGUAGE_PROFILES = {
+    "English": PRINTABLE_ASCII,
+    "Arabic": PRINTABLE_ASCII + ARABIC_SCRIPT,
+    # Latin-1 Supplement, Latin Extended-A/B and Latin Extended Additional
+    "Latin-extended": PRINTABLE_ASCII + [(0x00A0, 0x024F), (0x1E00, 0x1EFF)],
+    "French/German": PRINTABLE_ASCII + [
+        (ord(char), ord(char)) for char in "àâæçéèêëîïôœùûüÿÀÂÆÇÉÈÊËÎÏÔŒÙÛÜŸäöüßÄÖÜẞ«»€’"
+    ],
+    # Arabic script with the presentation forms and the zero-width non-joiner Persian needs;
+    # the forms end at U+FEFC so the byte order mark U+FEFF is still removed
+    "Persian/Urdu": PRINTABLE_ASCII + ARABIC_SCRIPT + [(0xFB50, 0xFDFF), (0xFE70, 0xFEFC), (0x200C, 0x200C)],
+}
+
 
-def remove_weird_characters(s, pattern):
+def _class_member(code_point):
+    char = chr(code_point)
+    # Escaped the same way for Python's re and Arrow's RE2
+    return "\\" + char if char in "\\]^-[" else char
+
+
+def disallowed_pattern(language):
+    """
+    Regex matching one character outside a language profile, usable by both
+    Python's `re` and the Arrow string kernels.
     """
-    Remove weird characters from the string, keeping only those defined in the pattern.
+    members = "".join(
+        _class_member(first) if first == last else f"{_class_member(first)}-{_class_member(last)}"
+        for first, last in LANGUAGE_PROFILES[language]
+    )
+    return f"[^{members}]"
+
+
+def clean_column(column, language):
     """
-    return ''.join(pattern.findall(s))
+    Removes every character outside a language profile from a column.
 
-def clean_columns(df, selected_columns, language):
+    One vectorized regex search (an Arrow kernel for Arrow-backed strings)
+    finds the cells holding disallowed characters, and only those cells go
+    through the regex replace. Values that are not strings are kept.
+
+    Returns:
+        tuple: (cleaned pd.Series, boolean mask of the cells that changed)
+    """
+    # Numbers, dates and the like are left as they are
+    if pd.api.types.infer_dtype(column, skipna=True) not in ("string", "empty", "mixed", "mixed-integer"):
+        return column, pd.Series(False, index=column.index)
+
+    pattern = disallowed_pattern(language)
+    changed = column.str.contains(pattern, regex=True, na=False).astype(bool)
+    if not changed.any():
+        return column, changed
+    cleaned = column.str.replace(pattern + "+", "", regex=True) if changed.all() else column.where(
+        ~changed, column[changed].str.replace(pattern + "+", "", regex=True)
+    )
+    return cleaned, changed
+
+
+def code_point(char):
+    return f"U+{ord(char):04X}"
+
+
+def clean_columns(df, selected_columns, language, progress=None):
     """
     Cleans weird characters from the specified columns of a DataFrame.
 
     Parameters:
         df (pd.DataFrame): The input DataFrame.
         selected_columns (list): List of columns to clean.
-        language (str): The language for character validation ("English" or "Arabic").
+        language (str): The language profile for character validation, a key of LANGUAGE_PROFILES.
+        progress (callable): Optional `progress(done, total, message)`, called before each column.
 
     Returns:
-        tuple: (cleaned DataFrame, DataFrame of rows with weird characters)
+        tuple: (cleaned DataFrame, DataFrame of the changed cells with columns
+        row, column, original, cleaned and removed)
     """
-    # Choose the appropriate regex pattern
-    pattern = ENGLISH_CHARACTERS if language == "English" else ARABIC_CHARACTERS
-    
+    pattern = disallowed_pattern(language)
     # Create a copy of the DataFrame for cleaning
     cleaned_df = df.copy()
-    rows_with_weird_characters = []
+    changed_cells = []
 
-    for col in selected_columns:
-        # Clean column data
-        cleaned_df[col] = cleaned_df[col].apply(
-            lambda x: remove_weird_characters(x, pattern) if isinstance(x, str) else x
-        )
+    for done, col in enumerate(selected_columns):
+        if progress is not None:
+            progress(done, len(selected_columns), col)
+        # Clean column data; the mask only marks cells whose text changed, so missing values never count
+        cleaned_df[col], changed = clean_column(df[col], language)
+        if not changed.any():
+            continue
 
-        # Identify rows with weird characters
-        weird_rows = df[df[col] != cleaned_df[col]]
-        rows_with_weird_characters.append(weird_rows)
+        original = df[col][changed]
+        removed = original.astype(str).str.findall(pattern).map(
+            lambda chars: " ".join(code_point(char) for char in sorted(set(chars)))
+        )
+        changed_cells.append(pd.DataFrame({
+            "row": original.index.to_numpy(),
+            "column": col,
+            "original": original.to_numpy(dtype=object),
+            "cleaned": cleaned_df[col][changed].to_numpy(dtype=object),
+            "removed": removed.to_numpy(dtype=object),
+        }))
 
-    # Concatenate rows with weird characters into a single DataFrame
-    if rows_with_weird_characters:
-        weird_characters_df = pd.concat(rows_with_weird_characters).drop_duplicates()
+    if changed_cells:
+        weird_characters_df = pd.concat(changed_cells, ignore_index=True)
+        # Spreadsheet row numbers, as in the validation error report
+        if pd.api.types.is_integer_dtype(weird_characters_df["row"]):
+            weird_characters_df["row"] += ROW_OFFSET
     else:
-        weird_characters_df = pd.DataFrame(columns=df.columns)
+        weird_characters_df = pd.DataFrame(columns=DIFF_COLUMNS)
 
     return cleaned_df, weird_characters_df
+
+
+def character_histogram(weird_characters_df):
+    """
+    Counts the cells each removed character was found in.
+
+    Parameters:
+        weird_characters_df (pd.DataFrame): The cell diff returned by `clean_columns`.
+
+    Returns:
+        pd.DataFrame: code_point, character, name and cells, most frequent first.
+    """
+    code_points = weird_characters_df["removed"].str.split().explode().dropna()
+    counts = code_points.value_counts()
+    characters = [chr(int(point[2:], 16)) for point in counts.index]
+    return pd.DataFrame({
+        "code_point": counts.index.to_numpy(dtype=object),
+        "character": characters,
+        "name": [unicodedata.name(char, f"<{unicodedata.category(char)}>") for char in characters],
+        "cells": counts.to_numpy(),
+    })